@@ -1,8 +1,14 @@
 import backtrader as bt
-import yfinance as yf
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
 import pandas as pd
+import os
+import sys
+
+# Make the shared signalchaser package importable when run from this folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from signalchaser import market_data, metrics, profiling
+from signalchaser.analyzers import EquityCurve, TradeRecorder
+from signalchaser.results_store import ResultsStore, strategy_params
 
 class Supertrend(bt.Indicator):
     """
@@ -91,6 +97,7 @@ class SupertrendStrategy(bt.Strategy):
         self.trade_list = []     # Historical trade log
         self.trade_count = 0     # Number of trades taken
         self.current_trade = None  # Current active trade reference
+        self.exit_price = None   # Fill price of the last closing order
 
     def next(self):
         """
@@ -116,6 +123,11 @@ class SupertrendStrategy(bt.Strategy):
                 self.close()
                 print(f"SELL SIGNAL at {self.data.datetime.date()} - Price: {self.data.close[0]:.2f}")
 
+    def notify_order(self, order):
+        """Remember the fill price of closing orders (Trade only keeps the entry price)"""
+        if order.status == order.Completed and order.issell():
+            self.exit_price = order.executed.price
+
     def notify_trade(self, trade):
         """Keep track of completed trades"""
         if trade.isclosed:
@@ -123,7 +135,7 @@ class SupertrendStrategy(bt.Strategy):
                 'entry_date': bt.num2date(trade.dtopen),
                 'exit_date': bt.num2date(trade.dtclose),
                 'entry_price': trade.price,
-                'exit_price': trade.pnl,
+                'exit_price': self.exit_price,
                 'profit_loss': trade.pnl
             })
 
@@ -136,6 +148,9 @@ def plot_supertrend(cerebro):
     Args:
         cerebro: Backtrader cerebro instance containing the executed strategy
     """
+    # Imported here so headless runs never load matplotlib
+    import matplotlib.pyplot as plt
+    
     # Generate default Backtrader plot
     cerebro.plot(style='candlestick', volume=False)
     
@@ -176,7 +191,7 @@ def plot_supertrend(cerebro):
     plt.tight_layout()      # Adjust layout to prevent label clipping
     plt.show()
 
-def main():
+def main(plot=True):
     """
     Main execution function that:
     1. Downloads historical data
@@ -188,12 +203,18 @@ def main():
     - 100,000 initial capital
     - 80% position sizing
     - 0.1% commission per trade
+    
+    Set SIGNALCHASER_PROFILE=1 to print where the time goes (see signalchaser.profiling)
+    Pass plot=False for headless runs
     """
+    prof = profiling.Profiler('crypto_supertrend').start()
+    
     # Data acquisition
     start_date = datetime.now() - timedelta(days=60)
     end_date = datetime.now()
-    # Download hourly DOGEereum data from Yahoo Finance
-    data = yf.download('DOGE-USD', start=start_date, end=end_date, interval='1h')
+    # Hourly DOGE data from the shared cache (only missing bars are downloaded)
+    with prof.phase('data load'):
+        data = market_data.get_bars('DOGE-USD', start_date, end_date, interval='1h')
     
     # Initialize Backtrader's brain (cerebro)
     cerebro = bt.Cerebro()
@@ -208,7 +229,8 @@ def main():
     )
     
     # Prepare and add data feed
-    feed = bt.feeds.PandasData(dataname=data)  # Convert pandas DataFrame to Backtrader feed
+    with prof.phase('feed conversion'):
+        feed = market_data.to_bt_feed(data)  # Convert pandas DataFrame to Backtrader feed
     cerebro.adddata(feed)
     
     # Configure backtest parameters
@@ -218,14 +240,37 @@ def main():
     # Set realistic commission rate
     cerebro.broker.setcommission(commission=0.001)  # 0.1% commission
     
+    # Record equity curve and trades for the results store
+    cerebro.addanalyzer(EquityCurve, _name='equity', periods_per_year=metrics.PERIODS_PER_YEAR['1h'])
+    cerebro.addanalyzer(TradeRecorder, _name='trades')
+    
     # Execute and report
     print('Starting Portfolio Value: %.2f' % cerebro.broker.getvalue())
-    results = cerebro.run()  # Execute backtest
+    results = prof.run(cerebro)  # Execute backtest
     print('Final Portfolio Value: %.2f' % cerebro.broker.getvalue())
     
+    # Save run, parameters, trades and equity curve
+    strat = results[0]
+    with prof.phase('analyzers & results store'):
+        curve = strat.analyzers.equity.get_analysis()
+        with ResultsStore() as store:
+            run_id = store.save_run(
+                'supertrend', 'DOGE-USD',
+                interval='1h', start=start_date, end=end_date,
+                params=strategy_params(strat),
+                metrics=dict(strat.analyzers.equity.metrics(), final_value=cerebro.broker.getvalue()),
+                trades=strat.analyzers.trades.get_analysis(),
+                **curve
+            )
+    print(f'Results saved as run {run_id}')
+    
     # Store results and generate plots
     cerebro.runstrategy = results
-    plot_supertrend(cerebro)
+    if plot:
+        with prof.phase('plotting'):
+            plot_supertrend(cerebro)
+    
+    prof.finish()
 
 # Standard Python idiom for script execution
 if __name__ == '__main__':
@@ -0,0 +1,197 @@
+"""
+Gap + ATR trailing-stop strategy used by crypto_momentum_breakout
+
+Kept in its own module so the breakout script only imports Backtrader when a
+backtest actually runs (not for the data analysis alone).
+"""
+import logging
+
+import backtrader as bt
+import numpy as np
+
+
+class GapATRStrategy(bt.Strategy):
+    params = (
+        ("gap_threshold", 0.02),     # 2% price jump
+        ("atr_period", 14),          # ATR lookback period
+        ("atr_multiplier", 3),       # Multiplier for stop-loss
+        ("max_allocation", 0.15),    # Maximum 15% allocation per coin
+        ("event_indexed", False),    # Only visit feeds with a gap trigger or an open position
+        ("features", None)           # Precomputed signalchaser.features per pair, None = Backtrader ATR
+    )
+
+    def __init__(self):
+        # Create ATR and tracking dictionaries for each data feed
+        self.atrs = {} # ATR for each coin (only without precomputed features)
+        self.entry_prices = {} # Entry price for each coin
+        self.stop_losses = {} # Stop loss for each coin
+        self.active_trades = {} # Active trade status for each coin
+        self.allocations = {}  # Track allocation for each coin
+        self.entry_gaps = {}  # Gap that triggered the current entry, stored with each trade
+        self.held = set()  # Indices of feeds with an open position
+        self.schedule = None  # Bar datetime -> feeds with a live gap trigger (event-indexed mode)
+        self.feed_index = {id(d): i for i, d in enumerate(self.datas)}
+        
+        # Store initial portfolio value for allocation calculations
+        self.initial_portfolio = self.broker.getvalue()
+        
+        # Initialize indicators and tracking for each data feed
+        for i, d in enumerate(self.datas):
+            if self.params.features is None:
+                self.atrs[d._name] = bt.indicators.AverageTrueRange(d, period=self.params.atr_period)
+            elif self.params.features[d._name]['atr_period'] != self.params.atr_period:
+                # The stops would use a different ATR than the warm-up assumes
+                raise ValueError(f"Features for {d._name} were computed with atr_period="
+                                 f"{self.params.features[d._name]['atr_period']}, "
+                                 f"the strategy uses {self.params.atr_period}")
+            self.entry_prices[d._name] = None # Entry price for each coin
+            self.stop_losses[d._name] = None # Stop loss for each coin
+            self.active_trades[d._name] = False # Active trade status for each coin
+            self.allocations[d._name] = 0.0  # Track allocation percentage
+            logging.info(f'Initialized strategy for {d._name}')
+
+    def start(self):
+        # Register every feed with the broker up front, in feed order, so the
+        # portfolio value is summed in the same order whichever feeds are visited
+        for d in self.datas:
+            self.getposition(d)
+        if self.params.event_indexed:
+            self.schedule = self.build_schedule()
+            if self.schedule is None:
+                logging.info("Event-indexed mode needs preloaded data, scanning every feed instead")
+
+    def build_schedule(self):
+        """
+        Precompute on which bars each feed has a gap entry trigger
+
+        Returns a dict of bar datetime -> feed indices. A feed without a bar at
+        some datetime keeps showing its last bar, so a trigger stays live until
+        that feed's next bar, exactly like the full scan sees it.
+        """
+        dts = [np.asarray(d.datetime.array) for d in self.datas]
+        if any(len(a) == 0 for a in dts):
+            return None
+        timeline = np.unique(np.concatenate(dts))
+
+        schedule = {}
+        for i, d in enumerate(self.datas):
+            if self.params.features is not None:
+                gaps = self.params.features[d._name]['gap']
+            else:
+                close = np.asarray(d.close.array)
+                # Same formula as the per-bar check in bar_gap
+                gaps = np.r_[np.nan, (close[1:] - close[:-1]) / close[:-1]]
+            bars = np.flatnonzero(gaps >= self.params.gap_threshold)
+            next_dt = np.append(dts[i], np.inf)[bars + 1]
+            first = np.searchsorted(timeline, dts[i][bars])
+            last = np.searchsorted(timeline, next_dt)
+            for a, b in zip(first, last):
+                for dt in timeline[a:b]:
+                    schedule.setdefault(dt, []).append(i)
+        return schedule
+
+    def bar_gap(self, d):
+        """Close-to-close change of the current bar of ``d``"""
+        if self.params.features is not None:
+            return self.params.features[d._name]['gap'][len(d) - 1]
+        return (d.close[0] - d.close[-1]) / d.close[-1]
+
+    def bar_atr(self, d):
+        """ATR at the current bar of ``d``"""
+        if self.params.features is not None:
+            return self.params.features[d._name]['atr'][len(d) - 1]
+        return self.atrs[d._name][0]
+
+    def notify_order(self, order):
+        # Keep the set of feeds holding a position in sync with the broker
+        if order.status in (order.Partial, order.Completed):
+            i = self.feed_index[id(order.data)]
+            if self.getposition(order.data).size:
+                self.held.add(i)
+            else:
+                self.held.discard(i)
+
+    def next(self):
+        if self.params.features is not None and min(len(d) for d in self.datas) <= self.params.atr_period:
+            # Same warm-up the ATR indicators impose: wait until every feed has an ATR value
+            return
+        
+        current_portfolio = self.broker.getvalue()
+        logging.info(f"\nCurrent datetime: {self.datas[0].datetime.datetime(0)}")
+        logging.info(f"Portfolio value: ${current_portfolio:.2f}")
+        logging.info(f"Available cash: ${self.broker.getcash():.2f}")
+        
+        if self.schedule is None:
+            # Iterate through each data feed independently
+            feeds = range(len(self.datas))
+        else:
+            # Only feeds with an entry trigger or an open position can act on this bar,
+            # visited in feed order so orders are submitted in the same sequence
+            feeds = sorted(self.held.union(self.schedule.get(self.datetime[0], ())))
+        
+        for i in feeds:
+            self.process_feed(self.datas[i], current_portfolio)
+
+    def process_feed(self, d, current_portfolio):
+        """Entry check for a flat feed, trailing stop update for a held one"""
+        pos = self.getposition(d)
+        current_allocation = (pos.size * d.close[0] / current_portfolio) if pos else 0
+        self.allocations[d._name] = current_allocation
+        
+        # Log current price and position info
+        logging.info(f"\n{d._name}:")
+        logging.info(f"Current price: ${d.close[0]:.2f}")
+        logging.info(f"Position size: {pos.size if pos else 0}")
+        logging.info(f"Current allocation: {current_allocation*100:.2f}%")
+        
+        # Check for entry conditions if no position
+        if not pos:
+            if len(d) > 1:  # Make sure we have at least 2 bars
+                gap = self.bar_gap(d)
+                logging.info(f"Gap: {gap*100:.2f}%")
+                
+                if gap >= self.params.gap_threshold:
+                    # Calculate position size based on maximum allocation
+                    max_investment = current_portfolio * self.params.max_allocation # Maximum investment per coin
+                    available_cash = self.broker.getcash() # Available cash in portfolio
+                    target_value = min(max_investment, available_cash) # Target value for investment
+                    size = target_value / d.close[0] # Position size
+                    
+                    self.entry_prices[d._name] = d.close[0] # Entry price
+                    self.entry_gaps[d._name] = gap # Entry gap
+                    self.stop_losses[d._name] = d.close[0] - (self.bar_atr(d) * self.params.atr_multiplier) # Stop loss
+                    
+                    # Place the order
+                    self.buy(data=d, size=size)
+                    self.active_trades[d._name] = True
+                    
+                    logging.info(f'''
+                    BUY EXECUTED for {d._name}:
+                    Price: {d.close[0]:.2f}
+                    Size: {size:.6f} units
+                    Amount: ${target_value:.2f}
+                    Allocation: {(target_value/current_portfolio)*100:.2f}%
+                    Gap: {gap*100:.2f}%
+                    Stop Loss: {self.stop_losses[d._name]:.2f}
+                    ''')
+        
+        # Update stop loss for existing position
+        elif pos:
+            # Update trailing stop
+            self.stop_losses[d._name] = max(
+                self.stop_losses[d._name],
+                d.close[0] - (self.bar_atr(d) * self.params.atr_multiplier)
+            )
+            
+            logging.info(f"Current stop loss: ${self.stop_losses[d._name]:.2f}")
+            
+            # Check if stop loss is hit
+            if d.close[0] < self.stop_losses[d._name]:
+                self.close(data=d)
+                self.active_trades[d._name] = False
+                self.allocations[d._name] = 0.0
+                logging.info(f'''
+                SELL EXECUTED for {d._name}:
+                Price: {d.close[0]:.2f}
+                Stop Loss: {self.stop_losses[d._name]:.2f}
+                ''')
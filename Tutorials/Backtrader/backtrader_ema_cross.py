@@ -1,6 +1,12 @@
-import yfinance as yf
+import os
+import sys
 import backtrader as bt
 
+# Make the shared signalchaser package importable when run from this folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from signalchaser import market_data, metrics, profiling
+from signalchaser.analyzers import EquityCurve
+
 # Step 1: Define the Strategy
 class EMACrossStrategy(bt.Strategy):
     # Define the parameters for the EMAs
@@ -26,33 +32,24 @@ class EMACrossStrategy(bt.Strategy):
                 self.sell()
 
 # Step 2: Set up the Backtest Environment
-def run_backtest():
+def run_backtest(plot=True):
+    # Optional timing report, enabled with SIGNALCHASER_PROFILE=1
+    prof = profiling.Profiler('backtrader_ema_cross').start()
+
     # Create a Backtrader Cerebro engine
     cerebro = bt.Cerebro()
 
-    # Step 3: Download AAPL data using yfinance
-    aapl_data = yf.download('AAPL', 
-                           start='2020-01-01', 
-                           end='2024-01-01',
-                           auto_adjust=True)
-    
-    # Clean up the MultiIndex structure - keep the price type, drop the ticker
-    aapl_data.columns = aapl_data.columns.get_level_values(0)  # Keep the first level (Price type)
-    aapl_data.columns = [col.lower() for col in aapl_data.columns]  # Convert to lowercase
-    
-    print("Final columns:", aapl_data.columns)  # Debug print
+    # Step 3: Load AAPL daily data through the shared cache
+    # get_bars returns flat lowercase OHLCV columns, no MultiIndex cleanup needed
+    with prof.phase('data load'):
+        aapl_data = market_data.get_bars('AAPL', 
+                                         start='2020-01-01', 
+                                         end='2024-01-01',
+                                         interval='1d')
     
     # Create a Pandas data feed
-    data = bt.feeds.PandasData(
-        dataname=aapl_data,
-        datetime=None,    # Use index as datetime
-        open='open',      # Column name for Open
-        high='high',      # Column name for High
-        low='low',        # Column name for Low
-        close='close',    # Column name for Close
-        volume='volume',  # Column name for Volume
-        openinterest=-1   # Column position for Open Interest (not available)
-    )
+    with prof.phase('feed conversion'):
+        data = market_data.to_bt_feed(aapl_data)
 
     # Step 4: Add data to the engine
     cerebro.adddata(data)
@@ -69,70 +66,66 @@ def run_backtest():
     # Step 8: Set the position size to 90% of available cash
     cerebro.addsizer(bt.sizers.PercentSizer, percents=90)
 
-    # Step 9: Add analyzers for performance evaluation
-    cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe')
-    cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
-    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trade_analysis')
+    # Step 9: Record the equity curve, metrics are computed from it after the run
+    cerebro.addanalyzer(EquityCurve, _name='equity', periods_per_year=metrics.PERIODS_PER_YEAR['1d'])
 
     # Step 10: Run the backtest and print results nicely
     print('\n====== Backtest Results ======')
     print(f'Starting Portfolio Value: ${cerebro.broker.getvalue():,.2f}')
     
-    results = cerebro.run()
+    results = prof.run(cerebro)
     final_value = cerebro.broker.getvalue()
     
-    # Calculate strategy returns
-    strategy_returns = (final_value - 100000) / 100000 * 100
+    # Strategy and buy & hold metrics in one vectorized pass each
+    with prof.phase('analyzers'):
+        stats = results[0].analyzers.equity.metrics()
+        buy_hold = metrics.compute_metrics(aapl_data['close'].to_numpy(),
+                                           periods_per_year=metrics.PERIODS_PER_YEAR['1d'])
     
-    # Get strategy drawdown info
-    drawdown = results[0].analyzers.drawdown.get_analysis()
-    
-    # Calculate buy & hold returns and drawdown
-    start_price = aapl_data['close'].iloc[0]  # Using iloc instead of []
-    end_price = aapl_data['close'].iloc[-1]   # Using iloc instead of []
-    buy_hold_returns = (end_price - start_price) / start_price * 100
-    
-    # Calculate buy & hold drawdown
-    rolling_max = aapl_data['close'].expanding().max()
-    drawdowns = (aapl_data['close'] - rolling_max) / rolling_max * 100
-    max_buy_hold_drawdown = abs(drawdowns.min())
+    strategy_returns = stats['total_return'] * 100
+    buy_hold_returns = buy_hold['total_return'] * 100
+    strategy_drawdown = stats['max_drawdown'] * 100
+    max_buy_hold_drawdown = buy_hold['max_drawdown'] * 100
     
     print(f'\nFinal Portfolio Value: ${final_value:,.2f}')
     print(f'\nReturns Comparison:')
     print(f'  Strategy Return: {strategy_returns:.2f}%')
     print(f'  Buy & Hold Return: {buy_hold_returns:.2f}%')
     print(f'  Strategy vs Buy & Hold: {strategy_returns - buy_hold_returns:.2f}%')
+    print(f'  Strategy CAGR: {stats["cagr"]*100:.2f}%')
     
     print(f'\nDrawdown Comparison:')
-    print(f'  Strategy Max Drawdown: {drawdown.max.drawdown:.2f}%')
+    print(f'  Strategy Max Drawdown: {strategy_drawdown:.2f}%')
     print(f'  Buy & Hold Max Drawdown: {max_buy_hold_drawdown:.2f}%')
-    print(f'  Drawdown Difference: {drawdown.max.drawdown - max_buy_hold_drawdown:.2f}%')
+    print(f'  Drawdown Difference: {strategy_drawdown - max_buy_hold_drawdown:.2f}%')
     
-    # Print Sharpe Ratio
-    sharpe = results[0].analyzers.sharpe.get_analysis()['sharperatio']
-    print(f'\nSharpe Ratio: {sharpe:.3f}')
+    # Print Sharpe / Sortino Ratio
+    print(f'\nSharpe Ratio: {stats["sharpe"]:.3f}')
+    print(f'Sortino Ratio: {stats["sortino"]:.3f}')
     
     # Print Drawdown Info
-    drawdown = results[0].analyzers.drawdown.get_analysis()
     print(f'\nDrawdown:')
-    print(f'  Max Drawdown: {drawdown.max.drawdown:.2f}%')
-    print(f'  Longest Drawdown: {drawdown.max.len} days')
+    print(f'  Max Drawdown: {strategy_drawdown:.2f}%')
+    print(f'  Longest Drawdown: {stats["max_drawdown_duration"]} days')
+    print(f'  Market Exposure: {stats["exposure"]*100:.2f}%')
     
     # Print Trade Analysis
-    trade_analysis = results[0].analyzers.trade_analysis.get_analysis()
-    
     print(f'\nTrade Analysis:')
-    print(f'  Total Trades: {trade_analysis.total.total}')
-    print(f'  Winning Trades: {trade_analysis.won.total}')
-    print(f'  Losing Trades: {trade_analysis.lost.total}')
-    print(f'  Win Rate: {(trade_analysis.won.total/trade_analysis.total.total)*100:.2f}%')
-    print(f'  Average Profit per Trade: ${trade_analysis.pnl.net.average:.2f}')
-    print(f'  Largest Win: ${trade_analysis.won.pnl.max:.2f}')
-    print(f'  Largest Loss: ${trade_analysis.lost.pnl.max:.2f}')
+    print(f'  Total Trades: {stats["total_trades"]}')
+    print(f'  Winning Trades: {stats["won_trades"]}')
+    print(f'  Losing Trades: {stats["lost_trades"]}')
+    print(f'  Win Rate: {stats["win_rate"]*100:.2f}%')
+    print(f'  Average Profit per Trade: ${stats["avg_trade_pnl"]:.2f}')
+    print(f'  Largest Win: ${stats["largest_win"]:.2f}')
+    print(f'  Largest Loss: ${stats["largest_loss"]:.2f}')
     print('\n============================')
 
-    # Step 11: Plot the results
-    cerebro.plot()
+    # Step 11: Plot the results (skipped for headless runs)
+    if plot:
+        with prof.phase('plotting'):
+            cerebro.plot()
+
+    prof.finish()
 
 # Run the backtest
 if __name__ == '__main__':
@@ -0,0 +1,61 @@
+import requests
+import time
+from datetime import datetime, timedelta, timezone
+import os
+import sys
+
+# Make the shared signalchaser package importable when run from this folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from signalchaser import market_data
+from signalchaser.alerts import MoveDetector, alert_embeds
+
+from crypto_movers import read_crypto_list
+
+# Detector state (last close + volatility per symbol) carried between hourly runs
+STATE_FILE = os.path.join(market_data.CACHE_DIR, "move_detector_state.npz")
+
+def detect_moves(trading_pairs, lookback_hours=48):
+    """Feed the newest hourly bars of the whole universe to the move detector"""
+    detector = MoveDetector(trading_pairs.keys(), threshold=2.0, z_threshold=4.0)
+    first_run = not os.path.exists(STATE_FILE)
+    if not first_run:
+        detector.load(STATE_FILE)
+    
+    # Bars come from the shared cache, only the latest hours are downloaded.
+    # The range ends at the still-open hourly bar (end is exclusive), so it is
+    # neither downloaded again nor scored, it is picked up once it has closed
+    now = datetime.now(timezone.utc)
+    current_hour = market_data.to_utc(now).floor("1h")
+    start = now - timedelta(hours=lookback_hours)
+    frames = market_data.get_bars(list(trading_pairs), start, end=current_hour, interval="1h")
+    
+    alerts = detector.update_frames(frames)
+    if first_run:
+        # The first run only builds up last closes and volatility, don't replay old moves
+        alerts = []
+    
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    detector.save(STATE_FILE)
+    return alerts
+
+def main():
+    print("\nReading crypto list from CSV...")
+    trading_pairs = read_crypto_list()
+    
+    WEBHOOK_URL = os.getenv("DISCORD_CRYPTO_ALERTS_WEBHOOK") or os.getenv("DISCORD_CRYPTO_MOVERS_WEBHOOK")
+    
+    if trading_pairs and WEBHOOK_URL:
+        print("Detecting large hourly moves...")
+        alerts = detect_moves(trading_pairs)
+        print(f"{len(alerts)} new alerts")
+        
+        for message in alert_embeds(alerts, names=trading_pairs):
+            requests.post(WEBHOOK_URL, json=message)
+            time.sleep(1)  # Rate limiting
+        
+        print("Alerts complete")
+    else:
+        print("Error: Missing trading pairs or webhook URL")
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,37 @@
-import yfinance as yf
+import numpy as np
 import pandas as pd
 import requests
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import os
+import sys
+
+# Make the shared signalchaser package importable when run from this folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from signalchaser import market_data
+from signalchaser.panel import UniversePanel
 
 def read_crypto_list():
     """Read crypto list from CSV"""
     try:
-        df = pd.read_csv('top_crypto_list.csv')
+        # Next to this script, so it works from any working directory
+        df = pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'top_crypto_list.csv'))
         return dict(zip(df['symbol'], df['name']))
     except Exception as e:
         print(f"Error reading crypto list: {e}")
         return {}
 
 def fetch_data(symbol: str, period: str = "2mo", interval: str = "1h"):
-    """Fetch data using yfinance with basic validation"""
+    """Fetch data through the shared market data cache with basic validation"""
     try:
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(period=period, interval=interval)
+        df = market_data.get_bars(symbol, market_data.period_start(period), interval=interval)
         
         if df.empty:
             print(f"No data returned for {symbol}")
             return None
             
         # Basic volume filter
-        recent_volume = df['Volume'].iloc[-24:].mean() * df['Close'].iloc[-1]  # Last 24h avg volume in USD
+        recent_volume = df['volume'].iloc[-24:].mean() * df['close'].iloc[-1]  # Last 24h avg volume in USD
         if recent_volume < 50000:  # $50k minimum recent volume
             print(f"Insufficient volume for {symbol}: ${recent_volume:,.0f}")
             return None
@@ -37,6 +43,9 @@ def fetch_data(symbol: str, period: str = "2mo", interval: str = "1h"):
 
 def get_coin_logo(symbol: str) -> str:
     """Get coin logo URL from CoinGecko"""
+    if market_data.get_provider() is not None:
+        # Offline runs never touch CoinGecko
+        return "https://cdn.discordapp.com/embed/avatars/0.png"
     try:
         clean_symbol = symbol.split('-')[0]  # Remove -USD
         response = requests.get(f"https://api.coingecko.com/api/v3/search?query={clean_symbol}")
@@ -59,39 +68,55 @@ def analyze_timeframes(trading_pairs):
         '2mo': 1440  # 60 * 24
     }
     
-    all_data = []
-    for symbol, name in trading_pairs.items():
+    # Close / volume for the whole universe as float32 arrays on one hourly axis,
+    # each fetched frame is copied in and dropped right away
+    end = datetime.now(timezone.utc)
+    panel = UniversePanel(trading_pairs.keys(), market_data.period_start("3mo", end), end, freq="1h")
+    for symbol in trading_pairs:
         print(f"Analyzing {symbol}...")
         
         df = fetch_data(symbol, period="3mo", interval="1h")
         
         if df is not None and not df.empty:
-            current_price = df['Close'].iloc[-1]
-            volume_24h = df['Volume'].iloc[-24:].mean() * current_price  # 24h average volume in USD
-            
-            # Calculate returns for each timeframe
-            returns = {}
-            for timeframe, hours in timeframes.items():
-                if len(df) >= hours:  # Make sure we have enough data
-                    past_price = df['Close'].iloc[-hours]
-                    ret = ((current_price - past_price) / past_price) * 100
-                    returns[timeframe] = ret
-                else:
-                    print(f"Insufficient data for {symbol} {timeframe} ({len(df)} < {hours} hours)")
-                    returns[timeframe] = 0
-            
-            print(f"Debug - {symbol}: Price {current_price:.8f}, Volume ${volume_24h:,.0f}")
-            for tf, ret in returns.items():
-                print(f"{tf}: {ret:.2f}%")
-            
-            all_data.append({
-                'symbol': symbol,
-                'name': name,
-                'price': current_price,
-                'volume': volume_24h,
-                'logo': get_coin_logo(symbol),
-                **returns
-            })
+            panel.add(symbol, df)
+    print(panel.memory_report())
+    
+    # Calculate prices, volumes and returns for every symbol at once. Windows are
+    # hours on the shared axis, a missing bar doesn't stretch a timeframe.
+    # Prices are the float64 last closes, the float32 panel would add noise digits
+    prices = panel.current_price()
+    volumes = panel.avg_volume_usd(24)  # 24h average volume in USD
+    returns_by_timeframe = {tf: panel.returns(hours) for tf, hours in timeframes.items()}
+    
+    all_data = []
+    for row, (symbol, name) in enumerate(trading_pairs.items()):
+        if not panel.valid[row]:
+            continue
+        
+        current_price = float(prices[row])
+        volume_24h = float(volumes[row])
+        
+        returns = {}
+        for timeframe, hours in timeframes.items():
+            ret = returns_by_timeframe[timeframe][row]
+            if np.isnan(ret):
+                n_bars = panel.last[row] - panel.first[row] + 1
+                print(f"Insufficient data for {symbol} {timeframe} ({n_bars} < {hours} hours)")
+                ret = 0
+            returns[timeframe] = float(ret)
+        
+        print(f"Debug - {symbol}: Price {current_price:.8f}, Volume ${volume_24h:,.0f}")
+        for tf, ret in returns.items():
+            print(f"{tf}: {ret:.2f}%")
+        
+        all_data.append({
+            'symbol': symbol,
+            'name': name,
+            'price': current_price,
+            'volume': volume_24h,
+            'logo': get_coin_logo(symbol),
+            **returns
+        })
     
     # Create Discord embeds for each timeframe
     for timeframe in timeframes.keys():
@@ -116,7 +141,7 @@ def analyze_timeframes(trading_pairs):
     
     return timeframe_messages
 
-if __name__ == "__main__":
+def main():
     print("\nReading crypto list from CSV...")
     trading_pairs = read_crypto_list()
     
@@ -134,3 +159,6 @@ if __name__ == "__main__":
         print("Analysis complete")
     else:
         print("Error: Missing trading pairs or webhook URL")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 import requests
 import csv
 import os
+import sys
 from datetime import datetime
 
+# Make the shared signalchaser package importable when run from this folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
 # API endpoint for CoinGecko
 COINGECKO_API_URL = "https://api.coingecko.com/api/v3/coins/markets"
 
@@ -12,6 +16,14 @@ if not os.path.exists(CSV_DIR):
     os.makedirs(CSV_DIR)
 
 def get_top_1000_cryptos():
+    # Offline provider (synthetic / replay) stands in for CoinGecko. market_data
+    # pulls in pandas, so it is only imported when a provider is configured
+    if os.environ.get('SIGNALCHASER_PROVIDER'):
+        from signalchaser import market_data
+        provider = market_data.get_provider()
+        if provider is not None:
+            return provider.get_top_cryptos(1000)
+
     try:
         all_cryptos = []
         params = {
@@ -0,0 +1,6 @@
+"""
+Shared helpers for the SignalChaser scripts.
+
+Modules are imported on demand (e.g. ``from signalchaser import metrics``) so
+that importing the package itself stays cheap.
+"""
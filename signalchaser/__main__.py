@@ -0,0 +1,4 @@
+"""``python -m signalchaser <command>``, see signalchaser.cli"""
+from signalchaser.cli import main
+
+main()
@@ -0,0 +1,212 @@
+"""
+Incremental large-move detection across a universe
+
+``MoveDetector`` keeps, per symbol, only the last close, the timestamp of that
+close and an exponentially weighted variance of bar returns. Each update with
+new bars costs O(symbols in the update), no history is re-scanned.
+
+A move is flagged when either
+
+* the absolute bar return is at least ``threshold`` percent, or
+* the return is at least ``z_threshold`` standard deviations of the symbol's
+  recent (EWMA) volatility, once ``min_history`` returns have been seen.
+
+Repeated alerts are de-duplicated: a bar already processed is ignored, and a
+symbol that alerted in the same direction within ``cooldown`` is not alerted
+again.
+"""
+import numpy as np
+import pandas as pd
+
+from signalchaser import market_data
+
+
+class MoveDetector:
+    """
+    Streaming detector of large bar-to-bar moves
+
+    Args:
+        symbols: Universe, in any order
+        threshold: Absolute percent move that always alerts
+        z_threshold: Volatility-scaled move that alerts
+        halflife: Half-life of the EWMA variance, in bars
+        min_history: Returns needed before z-score alerts are enabled
+        cooldown: Minimum time between two same-direction alerts of a symbol
+    """
+
+    def __init__(self, symbols, threshold=2.0, z_threshold=4.0, halflife=24,
+                 min_history=24, cooldown='6h'):
+        self.symbols = list(symbols)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.threshold = threshold
+        self.z_threshold = z_threshold
+        self.alpha = 1 - 0.5 ** (1 / halflife)
+        self.min_history = min_history
+        self.cooldown = pd.Timedelta(cooldown).value
+
+        n = len(self.symbols)
+        self.last_close = np.full(n, np.nan)
+        self.last_ts = np.full(n, np.iinfo(np.int64).min, dtype=np.int64)
+        self.variance = np.zeros(n)
+        self.n_returns = np.zeros(n, dtype=np.int64)
+        self.last_alert_ts = np.full(n, np.iinfo(np.int64).min, dtype=np.int64)
+        self.last_alert_sign = np.zeros(n, dtype=np.int8)
+
+    def update(self, timestamp, symbols, closes):
+        """
+        Process one close per symbol at ``timestamp``
+
+        Args:
+            timestamp: Bar timestamp
+            symbols: Symbols with a new bar (unknown symbols are ignored)
+            closes: Closing prices, same order as ``symbols``
+
+        Returns:
+            list of alert dicts (symbol, timestamp, previous_close, close,
+            pct_change, zscore, reason)
+        """
+        ts = market_data.to_utc(timestamp).value
+        pairs = [(self.index[s], c) for s, c in zip(symbols, closes) if s in self.index]
+        if not pairs:
+            return []
+        rows = np.fromiter((r for r, _ in pairs), dtype=np.int64, count=len(pairs))
+        close = np.fromiter((c for _, c in pairs), dtype=np.float64, count=len(pairs))
+
+        # Bars at or before the last processed one are replays, skip them
+        fresh = (ts > self.last_ts[rows]) & np.isfinite(close) & (close > 0)
+        rows, close = rows[fresh], close[fresh]
+        if not len(rows):
+            return []
+
+        prev = self.last_close[rows]
+        has_prev = np.isfinite(prev)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ret = np.where(has_prev, close / prev - 1.0, 0.0)
+            std = np.sqrt(self.variance[rows])
+            zscore = np.where(std > 0, ret / std, 0.0)
+
+        pct = ret * 100
+        big = has_prev & (np.abs(pct) >= self.threshold)
+        unusual = has_prev & (self.n_returns[rows] >= self.min_history) & (np.abs(zscore) >= self.z_threshold)
+        sign = np.sign(ret).astype(np.int8)
+        repeat = ((ts - self.last_alert_ts[rows]) < self.cooldown) & (self.last_alert_sign[rows] == sign)
+        flagged = (big | unusual) & ~repeat
+
+        # Update state after scoring, so a move is judged against the volatility before it
+        var = self.variance[rows]
+        self.variance[rows] = np.where(has_prev, (1 - self.alpha) * var + self.alpha * ret ** 2, var)
+        self.n_returns[rows] += has_prev
+        self.last_close[rows] = close
+        self.last_ts[rows] = ts
+        self.last_alert_ts[rows[flagged]] = ts
+        self.last_alert_sign[rows[flagged]] = sign[flagged]
+
+        when = pd.Timestamp(ts, tz='UTC')
+        alerts = []
+        for i in np.flatnonzero(flagged):
+            alerts.append({
+                'symbol': self.symbols[rows[i]],
+                'timestamp': when,
+                'previous_close': float(prev[i]),
+                'close': float(close[i]),
+                'pct_change': float(pct[i]),
+                'zscore': float(zscore[i]),
+                'reason': 'threshold' if big[i] else 'zscore',
+            })
+        return alerts
+
+    def update_frames(self, frames):
+        """
+        Feed new bars from a dict of normalized OHLCV frames, in time order
+
+        Only bars newer than the last processed bar of each symbol are used.
+        """
+        parts = []
+        for symbol, df in frames.items():
+            row = self.index.get(symbol)
+            if row is None or df is None or df.empty:
+                continue
+            new = df.index.as_unit('ns').asi8 > self.last_ts[row]
+            if new.any():
+                parts.append(pd.DataFrame({
+                    'ts': df.index.as_unit('ns').asi8[new],
+                    'symbol': symbol,
+                    'close': df['close'].to_numpy()[new],
+                }))
+        if not parts:
+            return []
+
+        bars = pd.concat(parts, ignore_index=True).sort_values('ts', kind='stable')
+        alerts = []
+        for ts, group in bars.groupby('ts', sort=True):
+            alerts.extend(self.update(pd.Timestamp(ts, tz='UTC'), group['symbol'], group['close']))
+        return alerts
+
+    def save(self, path):
+        """Persist the detector state between runs"""
+        np.savez(
+            path,
+            symbols=np.array(self.symbols),
+            last_close=self.last_close,
+            last_ts=self.last_ts,
+            variance=self.variance,
+            n_returns=self.n_returns,
+            last_alert_ts=self.last_alert_ts,
+            last_alert_sign=self.last_alert_sign,
+        )
+
+    def load(self, path):
+        """
+        Restore state saved by ``save``
+
+        Symbols no longer in the universe are dropped, new ones start empty.
+        """
+        with np.load(path) as state:
+            saved = {s: i for i, s in enumerate(state['symbols'].tolist())}
+            rows = np.array([self.index[s] for s in saved if s in self.index], dtype=np.int64)
+            src = np.array([saved[s] for s in saved if s in self.index], dtype=np.int64)
+            for name in ('last_close', 'last_ts', 'variance', 'n_returns',
+                         'last_alert_ts', 'last_alert_sign'):
+                getattr(self, name)[rows] = state[name][src]
+        return self
+
+
+def alert_embeds(alerts, names=None, per_embed=20, max_chars=5500, color=15105570):
+    """
+    Batch alerts into as few Discord webhook messages as possible
+
+    Discord allows 25 fields per embed, 10 embeds and 6000 characters per
+    message, so embeds are packed into messages until one of those is hit.
+    """
+    names = names or {}
+    alerts = sorted(alerts, key=lambda a: abs(a['pct_change']), reverse=True)
+    embeds = []
+    for start in range(0, len(alerts), per_embed):
+        chunk = alerts[start:start + per_embed]
+        embeds.append({
+            "title": f"⚡ Large Hourly Moves ({start + 1}-{start + len(chunk)} of {len(alerts)})",
+            "color": color,
+            "fields": [{
+                "name": f"{names.get(a['symbol'], a['symbol'])} ({a['symbol']})",
+                "value": (f"Change: {a['pct_change']:+.2f}% (z {a['zscore']:+.1f})\n"
+                          f"Price: ${a['previous_close']:.8g} → ${a['close']:.8g}\n"
+                          f"Bar: {a['timestamp']:%Y-%m-%d %H:%M} UTC"),
+                "inline": True,
+            } for a in chunk],
+            "timestamp": chunk[0]['timestamp'].isoformat(),
+        })
+
+    def size(embed):
+        return len(embed["title"]) + sum(len(f["name"]) + len(f["value"]) for f in embed["fields"])
+
+    messages = []
+    batch, chars = [], 0
+    for embed in embeds:
+        if batch and (len(batch) == 10 or chars + size(embed) > max_chars):
+            messages.append({"embeds": batch})
+            batch, chars = [], 0
+        batch.append(embed)
+        chars += size(embed)
+    if batch:
+        messages.append({"embeds": batch})
+    return messages
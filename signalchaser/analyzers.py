@@ -0,0 +1,189 @@
+"""
+Lightweight Backtrader analyzers that feed signalchaser.metrics,
+signalchaser.results_store and signalchaser.profiling
+"""
+import collections
+import time
+
+import backtrader as bt
+import numpy as np
+
+from signalchaser import metrics
+
+
+class EquityCurve(bt.Analyzer):
+    """
+    Record broker value and open position size on every bar
+
+    One analyzer replaces DrawDown, Returns, SharpeRatio and TradeAnalyzer:
+    the raw curve is stored once and all statistics are computed afterwards
+    with ``metrics.compute_metrics`` (also in bulk across runs). The net P&L
+    of every closed trade is kept as well, so trade statistics stay correct
+    when several feeds hold positions at the same time.
+    """
+    params = (
+        ('periods_per_year', 252),
+    )
+
+    def start(self):
+        self.values = []
+        self.positions = []
+        self.datetimes = []
+        self.trade_pnl = []
+        self.trade_returns = []
+        self._entry_value = {}
+        self._open = {}  # feed -> absolute size, open positions only
+
+    def notify_order(self, order):
+        # Track open positions from fills, so next() doesn't visit every feed
+        if order.status in (order.Partial, order.Completed):
+            size = abs(self.strategy.getposition(order.data).size)
+            if size:
+                self._open[order.data] = size
+            else:
+                self._open.pop(order.data, None)
+
+    def notify_trade(self, trade):
+        if trade.justopened:
+            # Notified before next(), so the last recorded value is the equity before the entry fill
+            self._entry_value[trade.ref] = self.values[-1] if self.values else self.strategy.broker.startingcash
+        elif trade.isclosed:
+            base = self._entry_value.pop(trade.ref, None)
+            self.trade_pnl.append(trade.pnlcomm)
+            self.trade_returns.append(trade.pnlcomm / base if base else np.nan)
+
+    def next(self):
+        self.datetimes.append(self.strategy.datetime[0])
+        self.values.append(self.strategy.broker.getvalue())
+        # Total absolute size of the open positions, non-zero while anything is held
+        self.positions.append(sum(self._open.values()))
+
+    def get_analysis(self):
+        return {
+            'timestamps': [bt.num2date(d) for d in self.datetimes],
+            'equity': np.asarray(self.values, dtype=np.float64),
+            'positions': np.asarray(self.positions, dtype=np.float64),
+        }
+
+    def metrics(self):
+        """Compute performance metrics for the recorded curve"""
+        analysis = self.get_analysis()
+        stats = metrics.compute_metrics(
+            analysis['equity'],
+            periods_per_year=self.p.periods_per_year,
+            positions=analysis['positions'],
+        )
+        # Closed trades one by one instead of the position mask, which merges feeds
+        stats.update(metrics.closed_trade_stats(self.trade_pnl, self.trade_returns))
+        return stats
+
+
+class TradeRecorder(bt.Analyzer):
+    """
+    Log closed trades with real entry / exit prices for the results store
+
+    Exit prices come from the fill of the closing order (Backtrader's Trade
+    only keeps the entry price). Strategies that expose an ``entry_gaps``
+    dict (data name -> gap at entry) get the gap stored with each trade.
+    """
+
+    def start(self):
+        self.trades = []
+        self._open_size = {}
+        self._exit_price = {}
+
+    def notify_order(self, order):
+        if order.status != order.Completed:
+            return
+        name = order.data._name
+        size = self._open_size.get(name, 0.0)
+        if (order.isbuy() and size >= 0) or (order.issell() and size <= 0):
+            # Opening or adding to a position
+            self._open_size[name] = size + order.executed.size
+        else:
+            self._exit_price[name] = order.executed.price
+
+    def notify_trade(self, trade):
+        if not trade.isclosed:
+            return
+        name = trade.data._name
+        size = self._open_size.pop(name, 0.0)
+        exit_price = self._exit_price.pop(name, trade.price)
+        cost = abs(size) * trade.price
+        self.trades.append({
+            'symbol': name or None,
+            'entry_date': bt.num2date(trade.dtopen),
+            'exit_date': bt.num2date(trade.dtclose),
+            'entry_price': trade.price,
+            'exit_price': exit_price,
+            'size': size,
+            'profit_loss': trade.pnl,
+            'profit_loss_net': trade.pnlcomm,
+            'return_pct': trade.pnl / cost * 100 if cost else None,
+            'gap': getattr(self.strategy, 'entry_gaps', {}).get(name),
+        })
+
+    def get_analysis(self):
+        return self.trades
+
+
+class BacktestProfile(bt.Analyzer):
+    """
+    Call counts and time spent in indicators, next(), analyzers and observers
+
+    Added by ``profiling.Profiler.run`` when profiling is on. The strategy's
+    methods are wrapped on the instance in start(), which Backtrader calls
+    before computing the indicators, so strategies need no changes.
+    Indicator times include their sub-indicators.
+    """
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.timings = {}
+        strat = self.strategy
+        labels = collections.Counter()
+        for ind in strat._lineiterators[bt.LineIterator.IndType]:
+            label = self._label(ind)
+            labels[label] += 1
+            if labels[label] > 1:
+                label = f"{label} #{labels[label]}"
+            # _once computes the whole series up front (runonce), _next one bar at a time
+            self._wrap(ind, '_once', ('indicators', label))
+            self._wrap(ind, '_next', ('indicators', label))
+        self._wrap(strat, 'next', 'next')
+        self._wrap(strat, 'prenext', 'prenext')
+        self._wrap(strat, '_next_analyzers', 'analyzers')
+        self._wrap(strat, '_next_observers', 'observers')
+
+    @staticmethod
+    def _label(ind):
+        name = getattr(ind.data, '_name', '')
+        return f"{type(ind).__name__}({name})" if name else type(ind).__name__
+
+    def _wrap(self, obj, method, key):
+        func = getattr(obj, method)
+        entry = self.timings.setdefault(key, [0, 0.0])
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            t0 = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                entry[0] += 1
+                entry[1] += clock() - t0
+
+        setattr(obj, method, timed)
+
+    def get_analysis(self):
+        indicators = {}
+        for key, (calls, seconds) in self.timings.items():
+            if isinstance(key, tuple):
+                entry = indicators.setdefault(key[1], [0, 0.0])
+                entry[0] += calls
+                entry[1] += seconds
+        return {
+            'started': self.started,
+            'indicators': indicators,
+            **{part: self.timings[part] for part in ('next', 'prenext', 'analyzers', 'observers')},
+        }
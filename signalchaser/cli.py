@@ -0,0 +1,132 @@
+"""
+Single command line entry point for the bot and strategy scripts
+
+    python -m signalchaser movers                # top performers per horizon -> Discord
+    python -m signalchaser alerts                # large hourly moves -> Discord
+    python -m signalchaser tickers               # refresh the top 1000 list from CoinGecko
+    python -m signalchaser breakout [--analysis-only] [--no-plot]
+    python -m signalchaser supertrend [--no-plot]
+    python -m signalchaser ema [--no-plot]
+
+Global options go before the command, e.g.
+``python -m signalchaser --provider synthetic:42 --profile breakout``.
+
+Only the standard library (and the stdlib-only profiling options) is
+imported up front. Each command loads its script when it runs, so heavy
+packages are only paid for by the commands that need them: pandas / numpy
+for anything touching market data, Backtrader for backtests, matplotlib
+only when plotting and yfinance only when bars are actually downloaded.
+
+The cold-start time (interpreter start until the command begins, i.e. until
+its first fetch) and the total run time are printed to stderr.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+from signalchaser.profiling import OPTIONS as PROFILE_OPTIONS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Command -> (script relative to the repo root, help text)
+SCRIPTS = {
+    'movers': ('discord_bot/crypto_movers.py', "Post the top performers per horizon to Discord"),
+    'alerts': ('discord_bot/crypto_alerts.py', "Post large hourly moves to Discord"),
+    'tickers': ('discord_bot/get_crypto_tickers.py', "Refresh the top 1000 crypto list"),
+    'breakout': ('Strategies/crypto_momentum_breakout.py', "Gap / ATR momentum breakout analysis and backtests"),
+    'supertrend': ('Strategies/crypto_supertrend.py', "Supertrend + EMA + ADX backtest on DOGE-USD"),
+    'ema': ('Tutorials/Backtrader/backtrader_ema_cross.py', "EMA crossover tutorial backtest on AAPL"),
+}
+
+
+def process_uptime():
+    """Seconds since the interpreter started, None where the OS doesn't tell"""
+    try:
+        with open('/proc/self/stat') as f:
+            # Field 22 is the start time in clock ticks since boot, the command
+            # name in field 2 may contain spaces, so split after its closing ')'
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def load_script(path):
+    """Import a script by path, with its folder importable as when run directly"""
+    path = os.path.join(ROOT, path)
+    folder = os.path.dirname(path)
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def profile_outputs(value):
+    """Validate a --profile-output value against the profiler's options"""
+    outputs = [o.strip() for o in value.lower().split(',') if o.strip()]
+    unknown = set(outputs) - set(PROFILE_OPTIONS)
+    if not outputs or unknown:
+        raise argparse.ArgumentTypeError(f"choose from {', '.join(PROFILE_OPTIONS)}, got {value!r}")
+    return ','.join(outputs)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m signalchaser', description="SignalChaser scripts")
+    parser.add_argument('--provider', help="Offline data provider, e.g. 'synthetic:42' or 'replay:<dir>' "
+                                           "(sets SIGNALCHASER_PROVIDER)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Print a profiling report (sets SIGNALCHASER_PROFILE)")
+    parser.add_argument('--profile-output', metavar='OUTPUTS', type=profile_outputs,
+                        help="Also write profile files, 'cprofile' and/or 'stacks' comma separated "
+                             "(implies --profile)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for command, (_, help_text) in SCRIPTS.items():
+        sub = commands.add_parser(command, help=help_text)
+        if command in ('breakout', 'supertrend', 'ema'):
+            sub.add_argument('--no-plot', action='store_true', help="Headless run, matplotlib is never imported")
+        if command == 'breakout':
+            sub.add_argument('--analysis-only', action='store_true',
+                             help="Only the price analysis, Backtrader is never imported")
+    return parser
+
+
+def entry_point(args):
+    """Load the command's script and return the function that runs it"""
+    module = load_script(SCRIPTS[args.command][0])
+    if args.command in ('movers', 'alerts'):
+        return module.main
+    if args.command == 'tickers':
+        return module.save_crypto_list
+    if args.command == 'breakout':
+        return lambda: module.main(analysis_only=args.analysis_only, plot=not args.no_plot)
+    if args.command == 'supertrend':
+        return lambda: module.main(plot=not args.no_plot)
+    return lambda: module.run_backtest(plot=not args.no_plot)
+
+
+def main(argv=None):
+    t0 = time.perf_counter()
+    args = build_parser().parse_args(argv)
+    # Settings are read from the environment when the modules need them
+    if args.provider:
+        os.environ['SIGNALCHASER_PROVIDER'] = args.provider
+    if args.profile or args.profile_output:
+        os.environ['SIGNALCHASER_PROFILE'] = args.profile_output or '1'
+
+    entry = entry_point(args)
+    ready = time.perf_counter()
+    startup = process_uptime()
+    cold = f"{startup:.2f}s since interpreter start" if startup is not None else f"{ready - t0:.2f}s"
+    print(f"[signalchaser] {args.command} ready in {cold} "
+          f"({ready - t0:.2f}s loading, {len(sys.modules)} modules)", file=sys.stderr)
+
+    entry()
+    print(f"[signalchaser] {args.command} finished in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
@@ -0,0 +1,91 @@
+"""
+Per-pair features computed once and shared by analysis, debugging and strategies
+
+``compute_features`` reads a normalized OHLCV frame and returns aligned numpy
+arrays (one value per bar, NaN where a value is not defined yet). The frame
+itself is never modified, so the same raw data can still be handed to
+``market_data.to_bt_feed`` or other consumers.
+
+Definitions match what the scripts used to compute inline:
+
+* ``pct_change``: close-to-close change in percent (``close.pct_change() * 100``)
+* ``gap``: the same change as a fraction, the GapATRStrategy entry signal
+* ``atr``: Wilder's average true range, identical to Backtrader's
+  ``AverageTrueRange`` (SMA seed over the first ``atr_period`` true ranges,
+  then ``prev * (1 - 1/period) + tr / period``)
+
+Bar ``i`` of the arrays is bar ``i`` of the frame and of a feed built from it,
+so a strategy can look up the current bar with ``len(data) - 1``.
+"""
+import math
+
+import numpy as np
+
+
+def true_range(high, low, close):
+    """True range per bar, NaN for the first bar (no previous close)"""
+    prev_close = np.r_[np.nan, close[:-1]]
+    tr = np.maximum(high, prev_close) - np.minimum(low, prev_close)
+    tr[0] = np.nan
+    return tr
+
+
+def wilder_average(values, period, first=0):
+    """
+    Wilder smoothing as in Backtrader's SmoothedMovingAverage
+
+    ``values[first:]`` must be defined. The first output is the simple average
+    of the first ``period`` values, earlier positions are NaN.
+    """
+    out = np.full(len(values), np.nan)
+    seed = first + period - 1
+    if seed >= len(values):
+        return out
+    alpha = 1.0 / period
+    alpha1 = 1.0 - alpha
+    prev = math.fsum(values[first:seed + 1]) / period
+    out[seed] = prev
+    # The recursion depends on the previous value, a plain loop over floats is fastest
+    smoothed = out.tolist()
+    for i, value in enumerate(values[seed + 1:].tolist(), start=seed + 1):
+        smoothed[i] = prev = prev * alpha1 + value * alpha
+    return np.asarray(smoothed)
+
+
+def compute_features(df, atr_period=14):
+    """
+    Returns, gaps and ATR of one normalized OHLCV frame
+
+    Returns:
+        dict with ``index`` (the frame's DatetimeIndex), ``atr_period`` and
+        float64 arrays ``close``, ``prev_close``, ``pct_change``, ``gap``,
+        ``true_range`` and ``atr``, all aligned with the frame's rows
+    """
+    close = df['close'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+
+    prev_close = np.r_[np.nan, close[:-1]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gap = (close - prev_close) / prev_close
+    tr = true_range(high, low, close)
+
+    return {
+        'index': df.index,
+        'close': close,
+        'prev_close': prev_close,
+        'pct_change': gap * 100,
+        'gap': gap,
+        'true_range': tr,
+        'atr': wilder_average(tr, atr_period, first=1),
+        'atr_period': atr_period,
+    }
+
+
+def compute_all(frames, atr_period=14):
+    """``compute_features`` for every non-empty frame of a symbol -> frame dict"""
+    return {
+        symbol: compute_features(df, atr_period)
+        for symbol, df in frames.items()
+        if df is not None and not df.empty
+    }
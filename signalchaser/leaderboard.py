@@ -0,0 +1,262 @@
+"""
+Historical movers leaderboard for a whole universe
+
+``crypto_movers`` ranks the universe once, at the latest hour. ``Leaderboard``
+computes the same ranking for every horizon at every hour of a
+``UniversePanel``, so "buy last week's top performers" can be backtested:
+
+* returns use the same definition as ``UniversePanel.returns``, evaluated at
+  every column instead of only the last one
+* a symbol is ranked at an hour when it has enough history for the horizon,
+  has not stopped trading and passes the 24h USD volume filter
+* ranks are stored as int16 matrices (symbols x hours), 1 = best performer,
+  0 = not ranked. 1000 symbols x 3 months x 6 horizons take about 26 MB
+
+``forward_returns`` and ``evaluate`` score equal-weight top-k baskets formed
+from the ranks against the equal-weight ranked universe.
+
+Run ``python -m signalchaser.leaderboard`` to build the leaderboard from the
+cache (or the provider set in SIGNALCHASER_PROVIDER) and print the summary.
+"""
+import numpy as np
+import pandas as pd
+
+from signalchaser import market_data
+
+# Horizon label -> length in hours, as in crypto_movers
+HORIZONS = {
+    '6h': 6,
+    '1d': 24,
+    '1w': 168,
+    '2w': 336,
+    '1mo': 720,
+    '2mo': 1440,
+}
+
+
+class Leaderboard:
+    """
+    Rank matrices for every horizon over a panel's time axis
+
+    Build with ``Leaderboard.from_panel`` or ``Leaderboard.load``.
+
+    Attributes:
+        symbols: list of symbols, row order of all matrices
+        timestamps: int64 ns UTC timestamps of the columns
+        close: float32 close panel (symbols x timestamps), used for forward returns
+        ranks: dict of horizon -> int16 ranks (symbols x timestamps)
+        horizons: dict of horizon -> length in bars
+    """
+
+    def __init__(self, symbols, timestamps, close, ranks, horizons):
+        self.symbols = list(symbols)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.close = close
+        self.ranks = ranks
+        self.horizons = horizons
+
+    @classmethod
+    def from_panel(cls, panel, horizons=None, min_volume_usd=50000, volume_bars=24):
+        """
+        Rank the universe at every column of ``panel``
+
+        Args:
+            panel: UniversePanel
+            horizons: dict of label -> hours, defaults to HORIZONS
+            min_volume_usd: Minimum average volume over ``volume_bars`` bars
+                times the close, None to rank every symbol
+            volume_bars: Window of the volume filter
+        """
+        if len(panel.symbols) > np.iinfo(np.int16).max:
+            raise ValueError(f"At most {np.iinfo(np.int16).max} symbols fit in int16 ranks")
+        horizons = horizons or HORIZONS
+        hour = pd.Timedelta(hours=1).value
+        bars = {label: hours * hour // panel.step for label, hours in horizons.items()}
+
+        close = panel.close
+        n_symbols, n_cols = close.shape
+        cols = np.arange(n_cols)
+        # Symbols are ranked between their first and last bar only
+        live = (cols >= panel.first[:, None]) & (cols <= panel.last[:, None])
+
+        if min_volume_usd is not None:
+            # Rolling average volume over the bars since the first one, as in avg_volume_usd
+            cum = np.cumsum(panel.volume, axis=1, dtype=np.float64)
+            window = cum.copy()
+            window[:, volume_bars:] -= cum[:, :-volume_bars]
+            counted = np.minimum(volume_bars, cols - panel.first[:, None] + 1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                volume_usd = window / counted * close
+            live &= volume_usd >= min_volume_usd
+
+        ranks = {}
+        order_values = np.arange(1, n_symbols + 1, dtype=np.int16)
+        for label, n in bars.items():
+            # Return over n bars ending at each column (close[t] vs close[t - n + 1])
+            # A horizon longer than the panel leaves every symbol unranked
+            past = np.full_like(close, np.nan)
+            if 0 < n <= n_cols:
+                past[:, n - 1:] = close[:, :n_cols - n + 1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ret = (close - past) / past
+            ranked = live & (cols - n + 1 >= panel.first[:, None]) & np.isfinite(ret)
+
+            # Sort each hour's returns, best first, unranked symbols last
+            key = np.where(ranked, -ret, np.inf).T
+            order = np.argsort(key, axis=1, kind='stable')
+            by_hour = np.empty((n_cols, n_symbols), dtype=np.int16)
+            np.put_along_axis(by_hour, order, order_values[None, :], axis=1)
+            rank = np.ascontiguousarray(by_hour.T)
+            rank[~ranked] = 0
+            ranks[label] = rank
+
+        return cls(panel.symbols, panel.timestamps, close, ranks, bars)
+
+    def top(self, horizon, k=10, when=None):
+        """Top ``k`` symbols for ``horizon`` at ``when`` (default: the last hour), best first"""
+        col = len(self.timestamps) - 1
+        if when is not None:
+            col = np.searchsorted(self.timestamps, market_data.to_utc(when).value, side='right') - 1
+        rank = self.ranks[horizon][:, col]
+        rows = np.flatnonzero((rank >= 1) & (rank <= k))
+        return [self.symbols[r] for r in rows[np.argsort(rank[rows])]]
+
+    def forward_returns(self, horizon, k=10, hold=24):
+        """
+        Forward return of the top-k basket formed at every hour
+
+        The basket is bought at the close of the ranking hour and held for
+        ``hold`` bars, equal weighted. Returns a frame indexed by formation time
+        with basket and universe returns in percent, their difference and the
+        basket size. Hours without a full basket window are dropped.
+        """
+        rank = self.ranks[horizon][:, :-hold]
+        entry = self.close[:, :-hold].astype(np.float64)
+        exit_ = self.close[:, hold:].astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fwd = (exit_ / entry - 1) * 100
+
+        in_basket = (rank >= 1) & (rank <= k)
+        ranked = rank > 0
+        size = in_basket.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            basket = np.where(in_basket, fwd, 0).sum(axis=0) / size
+            universe = np.where(ranked, fwd, 0).sum(axis=0) / ranked.sum(axis=0)
+
+        out = pd.DataFrame({
+            'basket': basket,
+            'universe': universe,
+            'excess': basket - universe,
+            'size': size,
+        }, index=pd.DatetimeIndex(pd.to_datetime(self.timestamps[:-hold], utc=True), name='datetime'))
+        return out[size > 0]
+
+    def evaluate(self, ks=(5, 10, 20), holds=(6, 24, 168), horizons=None):
+        """
+        Summary of top-k basket performance for every horizon, k and holding period
+
+        Statistics use non-overlapping formation times (one basket every
+        ``hold`` bars), so ``total_return`` is a tradeable rebalancing path.
+        """
+        rows = []
+        for horizon in horizons or self.horizons:
+            for k in ks:
+                for hold in holds:
+                    if hold >= len(self.timestamps):
+                        continue
+                    fwd = self.forward_returns(horizon, k, hold).iloc[::hold]
+                    if fwd.empty:
+                        continue
+                    excess = fwd['excess']
+                    std = excess.std()
+                    rows.append({
+                        'horizon': horizon,
+                        'k': k,
+                        'hold': hold,
+                        'samples': len(fwd),
+                        'mean_basket': fwd['basket'].mean(),
+                        'mean_universe': fwd['universe'].mean(),
+                        'mean_excess': excess.mean(),
+                        'hit_rate': (excess > 0).mean(),
+                        't_stat': excess.mean() / std * np.sqrt(len(excess)) if std > 0 else np.nan,
+                        'total_return': (np.prod(1 + fwd['basket'] / 100) - 1) * 100,
+                    })
+        return pd.DataFrame(rows)
+
+    def save(self, path):
+        """Store the ranks and close panel in one .npz file"""
+        np.savez(
+            path,
+            symbols=np.array(self.symbols),
+            timestamps=self.timestamps,
+            close=self.close,
+            horizons=np.array(list(self.horizons)),
+            bars=np.array(list(self.horizons.values()), dtype=np.int64),
+            **{f'ranks_{label}': rank for label, rank in self.ranks.items()},
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Restore a leaderboard saved by ``save``"""
+        with np.load(path) as state:
+            labels = state['horizons'].tolist()
+            return cls(
+                state['symbols'].tolist(),
+                state['timestamps'],
+                state['close'],
+                {label: state[f'ranks_{label}'] for label in labels},
+                dict(zip(labels, state['bars'].tolist())),
+            )
+
+    @property
+    def nbytes(self):
+        """Memory held by the rank matrices"""
+        return sum(r.nbytes for r in self.ranks.values())
+
+    def memory_report(self):
+        """One-line summary of the rank storage"""
+        return (f"Leaderboard {len(self.symbols):,} symbols x {len(self.timestamps):,} hours x "
+                f"{len(self.ranks)} horizons: {self.nbytes / 1e6:,.1f} MB of int16 ranks")
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import time
+
+    from signalchaser.panel import UniversePanel
+
+    parser = argparse.ArgumentParser(description="Build the historical movers leaderboard and score top-k baskets")
+    parser.add_argument('--symbols', type=int, default=1000)
+    parser.add_argument('--period', default='3mo')
+    parser.add_argument('--offline', action='store_true', help="Only use cached bars")
+    parser.add_argument('--output', help="Save the leaderboard to this .npz file")
+    args = parser.parse_args()
+
+    provider = market_data.get_provider()
+    if provider is not None:
+        symbols = [f"{c['symbol'].upper()}-USD" for c in provider.get_top_cryptos(args.symbols)]
+    else:
+        csv = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'discord_bot', 'top_crypto_list.csv')
+        symbols = pd.read_csv(csv)['symbol'].tolist()[:args.symbols]
+
+    t0 = time.perf_counter()
+    frames = market_data.get_bars(symbols, market_data.period_start(args.period), offline=args.offline)
+    panel = UniversePanel.from_frames(frames)
+    del frames
+    t1 = time.perf_counter()
+    board = Leaderboard.from_panel(panel)
+    t2 = time.perf_counter()
+    summary = board.evaluate()
+    t3 = time.perf_counter()
+
+    print(panel.memory_report())
+    print(board.memory_report())
+    print(f"Load {t1 - t0:.2f}s, ranks {t2 - t1:.2f}s, evaluation {t3 - t2:.2f}s")
+    with pd.option_context('display.width', 200, 'display.max_rows', 200, 'display.float_format', '{:.3f}'.format):
+        print(summary.to_string(index=False))
+    if args.output:
+        board.save(args.output)
+        print(f"Saved to {args.output}")
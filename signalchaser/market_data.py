@@ -0,0 +1,331 @@
+"""
+Cached market data shared by every script
+
+``get_bars`` returns normalized OHLCV frames:
+
+* columns ``open, high, low, close, volume`` as float64
+* a sorted, de-duplicated, UTC ``DatetimeIndex`` named ``datetime``
+
+Bars are stored in a local columnar cache (one ``.npy`` file per column, per
+symbol and interval) together with the time ranges already downloaded. Only
+the missing part of a requested range goes to Yahoo Finance, so repeated
+backtests and analyses over the same window do no network I/O at all. Column
+files can be memory-mapped for large universes.
+
+Cache location defaults to ``data_cache/`` at the repo root and can be moved
+with the ``SIGNALCHASER_CACHE_DIR`` environment variable. ``set_provider`` or
+``SIGNALCHASER_PROVIDER`` swap Yahoo Finance for an offline provider from
+``signalchaser.simulator``.
+"""
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+CACHE_DIR = os.environ.get(
+    'SIGNALCHASER_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data_cache'),
+)
+
+# Intervals Yahoo Finance does not serve, derived from cached hourly bars
+DERIVED_INTERVALS = ('2h', '4h', '6h', '8h', '12h')
+
+# Offline provider replacing Yahoo Finance (see signalchaser.simulator)
+_provider = None
+
+# Bar length for each yfinance interval, used to keep the still-open bar out of
+# the covered range. Longer intervals fall back to whole days.
+INTERVALS = {
+    '1m': '1min', '2m': '2min', '5m': '5min', '15m': '15min', '30m': '30min',
+    '60m': '1h', '90m': '90min', '1h': '1h', '1d': '1D',
+}
+
+
+def to_utc(value):
+    """Convert a date string / datetime / Timestamp to a UTC Timestamp"""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        return ts.tz_localize('UTC')
+    return ts.tz_convert('UTC')
+
+
+def period_start(period, end=None):
+    """
+    Start of a yfinance-style lookback period ('6h', '7d', '2wk', '3mo', '1y')
+
+    Months count as 30 days and years as 365, matching the timeframes used by
+    the movers job.
+    """
+    end = to_utc(end if end is not None else datetime.now(timezone.utc))
+    units = {'h': 'hours', 'd': 'days', 'wk': 'weeks'}
+    for suffix, days in (('mo', 30), ('y', 365)):
+        if period.endswith(suffix):
+            return end - pd.Timedelta(days=int(period[:-len(suffix)]) * days)
+    for suffix, unit in units.items():
+        if period.endswith(suffix):
+            return end - pd.Timedelta(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def normalize_ohlcv(df, symbol=None):
+    """
+    Bring a yfinance frame into the standard OHLCV layout
+
+    Handles ``yf.download`` output (MultiIndex columns with the ticker on one
+    level), ``Ticker.history`` output (extra Dividends / Stock Splits columns)
+    and frames that are already normalized.
+    """
+    if df is None or df.empty:
+        return empty_frame()
+
+    df = df.copy()
+    if isinstance(df.columns, pd.MultiIndex):
+        # Find the level holding the price fields and keep only that one
+        for level in range(df.columns.nlevels):
+            names = [str(n).lower() for n in df.columns.get_level_values(level)]
+            if 'close' in names:
+                break
+        if symbol is not None and df.columns.nlevels > 1:
+            other = 1 - level if df.columns.nlevels == 2 else None
+            if other is not None and symbol in df.columns.get_level_values(other):
+                df = df.xs(symbol, axis=1, level=other)
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(level)
+
+    df.columns = [str(c).lower() for c in df.columns]
+    df = df.loc[:, ~df.columns.duplicated()]
+    missing = [c for c in COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing OHLCV columns {missing} for {symbol or 'frame'}")
+
+    df = df[list(COLUMNS)].astype(np.float64)
+    index = pd.DatetimeIndex(df.index)
+    index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+    # Cache and panels work with int64 nanoseconds, whatever unit pandas picked
+    df.index = index.as_unit('ns')
+    df.index.name = 'datetime'
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    return df
+
+
+def empty_frame():
+    """An empty frame with the standard OHLCV layout"""
+    index = pd.DatetimeIndex([], tz='UTC', name='datetime').as_unit('ns')
+    return pd.DataFrame({c: np.array([], dtype=np.float64) for c in COLUMNS}, index=index)
+
+
+def _symbol_dir(symbol, interval, cache_dir=None):
+    return os.path.join(cache_dir or CACHE_DIR, interval, symbol.replace('/', '_'))
+
+
+def _read_meta(path):
+    try:
+        with open(os.path.join(path, 'meta.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'ranges': []}
+
+
+def _write_array(path, name, arr):
+    tmp = os.path.join(path, f'.{name}.tmp.npy')
+    np.save(tmp, arr)
+    os.replace(tmp, os.path.join(path, f'{name}.npy'))
+
+
+def load_columns(symbol, interval='1h', start=None, end=None, mmap=True, cache_dir=None):
+    """
+    Read cached bars as raw column arrays without building a DataFrame
+
+    Returns a dict with ``timestamp`` (int64 ns since epoch, UTC) and the OHLCV
+    columns, sliced to ``[start, end)``. With ``mmap=True`` the arrays are
+    read-only views onto the cache files, nothing is copied into memory.
+    Returns None if the symbol is not cached.
+    """
+    path = _symbol_dir(symbol, interval, cache_dir)
+    ts_file = os.path.join(path, 'timestamp.npy')
+    if not os.path.exists(ts_file):
+        return None
+
+    mode = 'r' if mmap else None
+    timestamps = np.load(ts_file, mmap_mode=mode)
+    lo = 0 if start is None else np.searchsorted(timestamps, to_utc(start).value, side='left')
+    hi = len(timestamps) if end is None else np.searchsorted(timestamps, to_utc(end).value, side='left')
+
+    out = {'timestamp': timestamps[lo:hi]}
+    for col in COLUMNS:
+        out[col] = np.load(os.path.join(path, f'{col}.npy'), mmap_mode=mode)[lo:hi]
+    return out
+
+
+def read_cache(symbol, interval='1h', start=None, end=None, mmap=False, cache_dir=None):
+    """Read cached bars for ``[start, end)`` as a normalized frame"""
+    cols = load_columns(symbol, interval, start, end, mmap=mmap, cache_dir=cache_dir)
+    if cols is None:
+        return empty_frame()
+    index = pd.DatetimeIndex(pd.to_datetime(cols.pop('timestamp'), utc=True), name='datetime')
+    return pd.DataFrame(cols, index=index, copy=not mmap)
+
+
+def write_cache(symbol, interval, df, covered=None):
+    """
+    Merge bars into the cache and record the time range they cover
+
+    Args:
+        symbol: Ticker symbol, e.g. 'BTC-USD'
+        interval: yfinance interval string
+        df: Normalized OHLCV frame with new bars
+        covered: Optional (start, end) range the bars were requested for,
+            gaps inside it (weekends, halts) are then not fetched again
+    """
+    path = _symbol_dir(symbol, interval)
+    os.makedirs(path, exist_ok=True)
+
+    existing = read_cache(symbol, interval)
+    merged = pd.concat([existing, df]) if not existing.empty else df
+    merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+
+    _write_array(path, 'timestamp', merged.index.as_unit('ns').asi8)
+    for col in COLUMNS:
+        _write_array(path, col, merged[col].to_numpy(dtype=np.float64))
+
+    meta = _read_meta(path)
+    if covered is not None:
+        start, end = (to_utc(t).value for t in covered)
+        meta['ranges'] = _merge_ranges(meta['ranges'] + [[start, end]])
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def missing_ranges(symbol, interval, start, end):
+    """Sub-ranges of ``[start, end)`` not yet covered by the cache"""
+    start, end = to_utc(start).value, to_utc(end).value
+    gaps = []
+    cursor = start
+    for lo, hi in _read_meta(_symbol_dir(symbol, interval))['ranges']:
+        if hi <= cursor:
+            continue
+        if lo >= end:
+            break
+        if lo > cursor:
+            gaps.append((cursor, lo))
+        cursor = max(cursor, hi)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return [(pd.Timestamp(lo, tz='UTC'), pd.Timestamp(hi, tz='UTC')) for lo, hi in gaps]
+
+
+def download(symbol, start, end, interval='1h'):
+    """Download bars from Yahoo Finance and normalize them"""
+    import yfinance as yf
+
+    df = yf.download(symbol, start=start, end=end, interval=interval,
+                     auto_adjust=True, progress=False)
+    return normalize_ohlcv(df, symbol)
+
+
+def _closed_until(end, interval):
+    """Clamp ``end`` to the start of the still-open bar so it is refetched later"""
+    now = pd.Timestamp(datetime.now(timezone.utc)).floor(INTERVALS.get(interval, '1D'))
+    return min(end, now)
+
+
+def set_provider(provider):
+    """Route get_bars to an offline provider, None restores Yahoo Finance"""
+    global _provider
+    _provider = provider
+
+
+def get_provider():
+    """The active offline provider, or None when using Yahoo Finance"""
+    global _provider
+    if _provider is None and os.environ.get('SIGNALCHASER_PROVIDER'):
+        from signalchaser.simulator import provider_from_spec
+
+        _provider = provider_from_spec(os.environ['SIGNALCHASER_PROVIDER'])
+    return _provider
+
+
+def get_bars(symbols, start, end=None, interval='1h', offline=False, mmap=False):
+    """
+    Get normalized OHLCV bars for one or many symbols, using the local cache
+
+    Args:
+        symbols: A symbol string or a list of symbols
+        start: Range start (inclusive), date string / datetime / Timestamp
+        end: Range end (exclusive), defaults to now
+        interval: yfinance interval string ('1h', '1d', ...) or one of
+            DERIVED_INTERVALS, which is resampled from hourly bars
+        offline: Never touch the network, return whatever is cached
+        mmap: Back the returned frames with memory-mapped cache files
+
+    Returns:
+        A DataFrame for a single symbol string, otherwise a dict of
+        symbol -> DataFrame. Symbols with no data get an empty frame.
+    """
+    if interval in DERIVED_INTERVALS:
+        from signalchaser import resample
+
+        return resample.get_resampled(symbols, interval, start, end, offline=offline)
+
+    provider = get_provider()
+    if provider is not None:
+        return provider.get_bars(symbols, start, end, interval)
+
+    single = isinstance(symbols, str)
+    symbol_list = [symbols] if single else list(symbols)
+    start = to_utc(start)
+    end = to_utc(end if end is not None else datetime.now(timezone.utc))
+
+    out = {}
+    for symbol in symbol_list:
+        if not offline:
+            for lo, hi in missing_ranges(symbol, interval, start, end):
+                try:
+                    fresh = download(symbol, lo, hi, interval)
+                except Exception as e:
+                    print(f"Error fetching {symbol} {interval} {lo} - {hi}: {e}")
+                    continue
+                if fresh.empty:
+                    # Could be a transient failure, don't mark the range as covered
+                    continue
+                # The still-open bar is stored but left uncovered so it is refreshed next time
+                closed = _closed_until(hi, interval)
+                write_cache(symbol, interval, fresh, (lo, closed) if closed > lo else None)
+        out[symbol] = read_cache(symbol, interval, start, end, mmap=mmap)
+
+    return out[symbol_list[0]] if single else out
+
+
+def to_bt_feed(df, **kwargs):
+    """Wrap a normalized OHLCV frame in a Backtrader PandasData feed"""
+    import backtrader as bt
+
+    # Backtrader works with naive datetimes, keep them in UTC
+    data = df[list(COLUMNS)]
+    if data.index.tz is not None:
+        data = data.tz_convert('UTC').tz_localize(None)
+    return bt.feeds.PandasData(
+        dataname=data,
+        datetime=None,
+        open='open',
+        high='high',
+        low='low',
+        close='close',
+        volume='volume',
+        openinterest=-1,
+        **kwargs
+    )
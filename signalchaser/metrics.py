@@ -0,0 +1,211 @@
+"""
+Vectorized performance metrics for equity curves
+
+Works on a single curve (1-D array) or a batch of curves (2-D array with one
+curve per row), so a whole parameter sweep can be scored in one pass instead
+of attaching DrawDown / Returns / SharpeRatio / TradeAnalyzer to every run.
+
+All returns are fractions (0.05 = 5%), multiply by 100 for display.
+"""
+import numpy as np
+
+# Bars per year for the intervals used in the scripts
+PERIODS_PER_YEAR = {
+    '1h': 24 * 365,   # crypto trades around the clock
+    '1d': 252,        # equities
+    '1d_crypto': 365,
+    '1w': 52,
+}
+
+
+def _as_batch(values):
+    """Return a 2-D float array and whether the input was a single curve"""
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.ndim == 1:
+        return arr[np.newaxis, :], True
+    if arr.ndim != 2:
+        raise ValueError(f"Expected 1-D or 2-D array, got {arr.ndim}-D")
+    return arr, False
+
+
+def drawdown_stats(equity):
+    """
+    Max drawdown and longest drawdown duration (in bars) for each curve
+
+    Args:
+        equity: 2-D array, one equity curve per row, NaN before a curve starts
+    """
+    # fmax skips the NaN padding instead of propagating it
+    running_max = np.fmax.accumulate(equity, axis=1)
+    drawdowns = equity / running_max - 1.0
+    max_drawdown = -np.nanmin(drawdowns, axis=1)
+
+    # Bars since the last new high: index minus the index of the last bar at a peak
+    bars = np.arange(equity.shape[1])
+    last_peak = np.where(drawdowns < 0, -1, bars)
+    last_peak = np.maximum.accumulate(last_peak, axis=1)
+    max_duration = (bars - last_peak).max(axis=1)
+
+    return max_drawdown, max_duration
+
+
+def _summarize_trades(rows, pnl, trade_returns, n_curves):
+    """Aggregate closed trades (curve row, P&L, return) into per-curve statistics"""
+    total = np.bincount(rows, minlength=n_curves)
+    won = np.bincount(rows, weights=pnl > 0, minlength=n_curves).astype(np.int64)
+    lost = np.bincount(rows, weights=pnl < 0, minlength=n_curves).astype(np.int64)
+    pnl_sum = np.bincount(rows, weights=pnl, minlength=n_curves)
+    ret_sum = np.bincount(rows, weights=trade_returns, minlength=n_curves)
+
+    largest_win = np.zeros(n_curves)
+    largest_loss = np.zeros(n_curves)
+    np.maximum.at(largest_win, rows, pnl)
+    np.minimum.at(largest_loss, rows, pnl)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        safe_total = np.where(total > 0, total, 1)
+        return {
+            'total_trades': total,
+            'won_trades': won,
+            'lost_trades': lost,
+            'win_rate': np.where(total > 0, won / safe_total, np.nan),
+            'avg_trade_pnl': np.where(total > 0, pnl_sum / safe_total, np.nan),
+            'avg_trade_return': np.where(total > 0, ret_sum / safe_total, np.nan),
+            'largest_win': largest_win,
+            'largest_loss': largest_loss,
+        }
+
+
+def trade_stats(equity, positions):
+    """
+    Per-curve trade statistics derived from an in-market mask
+
+    A trade is a run of consecutive bars where ``positions`` is non-zero. Its
+    P&L is measured from the equity at the bar before entry to the equity at
+    the bar after the run, the bar the exit order fills on, so the exit price
+    and both commissions are included. A run still open at the last bar is
+    not a closed trade and is left out.
+
+    Only valid for single-feed runs: with several feeds, overlapping positions
+    merge into one run. Use ``closed_trade_stats`` with the P&L of each trade
+    for those.
+
+    Args:
+        equity: 2-D array, one equity curve per row, NaN before a curve starts
+        positions: array of the same shape, non-zero while a position is open
+    """
+    held = np.nan_to_num(np.asarray(positions, dtype=np.float64)) != 0
+    n_curves, n_bars = held.shape
+    first = np.argmax(~np.isnan(equity), axis=1)
+
+    # Pad with a flat column on each side so runs touching the edges close properly
+    padded = np.zeros((n_curves, n_bars + 2), dtype=bool)
+    padded[:, 1:-1] = held
+    entry_rows, entry_cols = np.nonzero(padded[:, 1:-1] & ~padded[:, :-2])
+    exit_rows, exit_cols = np.nonzero(padded[:, 1:-1] & ~padded[:, 2:])
+
+    # Entries and exits come out in the same row-major order, one of each per trade
+    closed = exit_cols + 1 < n_bars
+    rows = entry_rows[closed]
+    base_cols = np.maximum(entry_cols[closed] - 1, first[rows])
+    start_value = equity[rows, base_cols]
+    end_value = equity[rows, exit_cols[closed] + 1]
+    return _summarize_trades(rows, end_value - start_value, end_value / start_value - 1.0, n_curves)
+
+
+def closed_trade_stats(pnl, trade_returns=None):
+    """
+    Trade statistics of one run from the net P&L of its closed trades
+
+    Same keys as ``trade_stats``, for runs where trades are known one by one
+    (e.g. Backtrader's ``Trade.pnlcomm``), which also works with several feeds.
+
+    Args:
+        pnl: net P&L of each closed trade
+        trade_returns: optional return of each trade, NaN average when missing
+    """
+    pnl = np.asarray(pnl, dtype=np.float64)
+    if trade_returns is None:
+        trade_returns = np.full(len(pnl), np.nan)
+    rows = np.zeros(len(pnl), dtype=np.intp)
+    stats = _summarize_trades(rows, pnl, np.asarray(trade_returns, dtype=np.float64), 1)
+    return {name: value[0].item() for name, value in stats.items()}
+
+
+def compute_metrics(equity, periods_per_year=252, positions=None, risk_free=0.0):
+    """
+    Compute performance metrics for one or many equity (or price) curves
+
+    Args:
+        equity: 1-D array for a single curve or 2-D array (curves x bars),
+            shorter curves left-padded with NaN as done by ``pad_curves``
+        periods_per_year: Bars per year, used to annualize CAGR, Sharpe and Sortino
+        positions: Optional in-market mask / position sizes with the same shape as
+            ``equity``. Enables exposure and trade statistics.
+        risk_free: Annual risk-free rate subtracted before Sharpe / Sortino
+
+    Returns:
+        dict of metric name -> value. Values are floats for a single curve and
+        arrays with one entry per curve for a batch.
+    """
+    curves, single = _as_batch(equity)
+    n_curves, n_bars = curves.shape
+    # Leading NaN marks bars before a shorter curve starts (see pad_curves),
+    # every curve is scored over its own bars only
+    valid = ~np.isnan(curves)
+    n_valid = valid.sum(axis=1)
+    if n_valid.min() < 2:
+        raise ValueError("Need at least two bars to compute metrics")
+    first = curves[np.arange(n_curves), np.argmax(valid, axis=1)]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = curves[:, 1:] / curves[:, :-1] - 1.0
+        excess = returns - risk_free / periods_per_year
+
+        total_return = curves[:, -1] / first - 1.0
+        years = (n_valid - 1) / periods_per_year
+        cagr = np.power(1.0 + total_return, 1.0 / years) - 1.0
+
+        mean_excess = np.nanmean(excess, axis=1)
+        volatility = np.nanstd(returns, axis=1, ddof=1)
+        sharpe = mean_excess / np.nanstd(excess, axis=1, ddof=1) * np.sqrt(periods_per_year)
+        downside = np.sqrt(np.nanmean(np.minimum(excess, 0.0) ** 2, axis=1))
+        sortino = mean_excess / downside * np.sqrt(periods_per_year)
+
+    max_drawdown, max_drawdown_duration = drawdown_stats(curves)
+
+    results = {
+        'total_return': total_return,
+        'cagr': cagr,
+        'volatility': volatility * np.sqrt(periods_per_year),
+        'sharpe': sharpe,
+        'sortino': sortino,
+        'max_drawdown': max_drawdown,
+        'max_drawdown_duration': max_drawdown_duration,
+    }
+
+    if positions is not None:
+        held, _ = _as_batch(positions)
+        if held.shape != curves.shape:
+            raise ValueError("positions must have the same shape as equity")
+        results['exposure'] = (np.nan_to_num(held) != 0).sum(axis=1) / n_valid
+        results.update(trade_stats(curves, held))
+
+    if single:
+        return {name: value[0].item() for name, value in results.items()}
+    return results
+
+
+def pad_curves(curves):
+    """
+    Stack curves of different lengths into one 2-D array for batch scoring
+
+    Shorter curves are left-padded with NaN, which ``compute_metrics`` skips,
+    so every curve gets the same figures as when scored on its own.
+    """
+    curves = [np.asarray(c, dtype=np.float64) for c in curves]
+    n_bars = max(len(c) for c in curves)
+    out = np.full((len(curves), n_bars), np.nan)
+    for i, c in enumerate(curves):
+        out[i, n_bars - len(c):] = c
+    return out
@@ -0,0 +1,154 @@
+"""
+Compact array-backed panel of close / volume for a whole universe
+
+Instead of keeping one full DataFrame per symbol, ``UniversePanel`` stores
+aligned close and volume as contiguous float32 matrices (one row per symbol)
+on a shared, regular timestamp axis. Rows are filled straight from fetch
+results, so per-symbol frames can be dropped as soon as they are read.
+
+Windows are measured on the time axis, not in bars: ``returns(24)`` spans the
+last 24 hourly columns (forward-filled over missing bars), where a per-frame
+``close.iloc[-24]`` would reach further back when bars are missing.
+
+10,000 symbols x 3 months of hourly bars take about 173 MB (close + volume),
+versus several GB for the equivalent dict of yfinance DataFrames.
+"""
+import numpy as np
+import pandas as pd
+
+from signalchaser import market_data
+
+
+class UniversePanel:
+    """
+    Close / volume matrices for many symbols on one regular time axis
+
+    Args:
+        symbols: Symbols in row order
+        start: First timestamp of the axis (rounded down to ``freq``)
+        end: End of the axis (exclusive)
+        freq: Bar length, e.g. '1h'
+
+    Attributes:
+        symbols: list of symbols, ``index[symbol]`` gives the row
+        timestamps: int64 ns UTC timestamps of the columns
+        close: float32 (symbols x timestamps), forward-filled, NaN before the first bar
+        volume: float32 (symbols x timestamps), 0 where a bar is missing
+        last_close: float64 last close of each symbol, full precision for display
+    """
+
+    def __init__(self, symbols, start, end, freq='1h'):
+        step = pd.Timedelta(freq).value
+        first = market_data.to_utc(start).value // step * step
+        last = market_data.to_utc(end).value
+        self.step = step
+        self.timestamps = np.arange(first, last, step, dtype=np.int64)
+        self.symbols = list(symbols)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+
+        shape = (len(self.symbols), len(self.timestamps))
+        self.close = np.full(shape, np.nan, dtype=np.float32)
+        self.volume = np.zeros(shape, dtype=np.float32)
+        self.first = np.full(len(self.symbols), -1, dtype=np.int64)
+        self.last = np.full(len(self.symbols), -1, dtype=np.int64)
+        self.last_close = np.full(len(self.symbols), np.nan)
+
+    @classmethod
+    def from_frames(cls, frames, freq='1h'):
+        """Build a panel from a dict of normalized OHLCV frames"""
+        frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+        if not frames:
+            return cls([], 0, 0, freq)
+        start = min(df.index[0] for df in frames.values())
+        end = max(df.index[-1] for df in frames.values()) + pd.Timedelta(freq)
+        panel = cls(list(frames), start, end, freq)
+        for symbol, df in frames.items():
+            panel.add(symbol, df)
+        return panel
+
+    def add(self, symbol, df):
+        """Copy the close / volume of one normalized frame into its row"""
+        row = self.index[symbol]
+        self.add_arrays(row, df.index.as_unit('ns').asi8, df['close'].to_numpy(), df['volume'].to_numpy())
+
+    def add_arrays(self, row, timestamps, close, volume):
+        """Fill one row from raw arrays, e.g. market_data.load_columns output"""
+        if not len(self.timestamps):
+            return
+        cols = (np.asarray(timestamps, dtype=np.int64) - self.timestamps[0]) // self.step
+        ok = (cols >= 0) & (cols < len(self.timestamps))
+        cols = cols[ok]
+        if not len(cols):
+            return
+
+        values = np.full(len(self.timestamps), np.nan, dtype=np.float32)
+        values[cols] = np.asarray(close)[ok]
+        # Forward-fill gaps so missing bars keep the last known price
+        valid = np.where(np.isnan(values), 0, np.arange(len(values)))
+        np.maximum.accumulate(valid, out=valid)
+        self.first[row] = cols[0]
+        self.last[row] = cols[-1]
+        filled = values[valid]
+        filled[:cols[0]] = np.nan
+        self.close[row] = filled
+        self.volume[row, cols] = np.asarray(volume)[ok]
+        self.last_close[row] = np.asarray(close, dtype=np.float64)[ok][-1]
+
+    @property
+    def valid(self):
+        """Rows that received data"""
+        return self.last >= 0
+
+    def current_price(self):
+        """Last close of each symbol in float64 (NaN for empty rows)"""
+        return self.last_close.copy()
+
+    def _panel_price(self):
+        """Last close of each symbol as stored in the float32 panel"""
+        rows = np.arange(len(self.symbols))
+        return np.where(self.valid, self.close[rows, np.maximum(self.last, 0)], np.nan)
+
+    def returns(self, bars):
+        """
+        Percent return over ``bars`` columns ending at each symbol's last bar
+
+        ``(close[last] - close[last - bars + 1]) / close[last - bars + 1]`` on
+        the time axis, so with hourly columns ``returns(24)`` spans 23 hours
+        like ``close.iloc[-24]`` on a gap-free frame. Missing bars don't
+        stretch the window. Symbols whose first bar is later than the window
+        start get NaN.
+        """
+        rows = np.arange(len(self.symbols))
+        past_col = self.last - bars + 1
+        enough = self.valid & (past_col >= self.first)
+        past = self.close[rows, np.clip(past_col, 0, None)]
+        # Both ends from the float32 panel, as Leaderboard ranks them
+        current = self._panel_price()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ret = (current - past) / past * 100
+        return np.where(enough, ret, np.nan)
+
+    def avg_volume_usd(self, bars=24):
+        """
+        Average volume over the last ``bars`` columns times the current price
+
+        Missing bars inside the window count as zero volume.
+        """
+        cols = self.last[:, None] + np.arange(-bars + 1, 1)
+        cols = np.clip(cols, 0, None)
+        window = np.take_along_axis(self.volume, cols, axis=1)
+        # Bars before the first one of a symbol don't count towards the average
+        counted = cols >= self.first[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg = np.where(counted, window, 0).sum(axis=1) / counted.sum(axis=1)
+        return np.where(self.valid, avg * self._panel_price(), np.nan)
+
+    @property
+    def nbytes(self):
+        """Memory held by the panel arrays"""
+        return sum(a.nbytes for a in (self.close, self.volume, self.timestamps, self.first, self.last))
+
+    def memory_report(self):
+        """One-line summary of the panel size"""
+        return (f"Panel {len(self.symbols):,} symbols x {len(self.timestamps):,} bars: "
+                f"{self.nbytes / 1e6:,.1f} MB")
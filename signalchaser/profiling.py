@@ -0,0 +1,215 @@
+"""
+Opt-in profiling for the backtest scripts
+
+Switched on with the ``SIGNALCHASER_PROFILE`` environment variable:
+
+* unset or '0': off, ``phase()`` hands out a shared no-op context and
+  ``run()`` is a plain ``cerebro.run()``
+* '1': phase timers plus a breakdown of every backtest (indicators, next(),
+  analyzers, observers, engine)
+* 'cprofile': additionally dump cProfile stats to ``<name>_<time>.prof``
+  (open with snakeviz or ``python -m pstats``)
+* 'stacks': additionally sample the main thread's call stack and write
+  collapsed stacks to ``<name>_<time>.folded`` (flamegraph.pl, speedscope)
+
+Options can be combined, e.g. ``SIGNALCHASER_PROFILE=cprofile,stacks``.
+
+Example:
+    prof = Profiler('crypto_supertrend').start()
+    with prof.phase('data load'):
+        data = market_data.get_bars(...)
+    results = prof.run(cerebro)
+    prof.finish()   # prints the report, writes the profile files
+"""
+import collections
+import contextlib
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+OPTIONS = ('cprofile', 'stacks')
+
+# Shared no-op context returned by phase() when profiling is off
+_NULL = contextlib.nullcontext()
+
+
+def options_from_env():
+    """Parsed SIGNALCHASER_PROFILE: None when off, else the set of extra outputs"""
+    value = os.environ.get('SIGNALCHASER_PROFILE', '').strip().lower()
+    if value in ('', '0', 'false', 'no', 'off'):
+        return None
+    return {o.strip() for o in value.split(',')} & set(OPTIONS)
+
+
+class _StackSampler(threading.Thread):
+    """Background thread counting the call stacks of one thread"""
+
+    def __init__(self, thread_id, interval=0.001):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """
+    Phase timers and backtest breakdowns for one script run
+
+    Args:
+        name: Label of the run, also the prefix of the profile files
+        options: None for off, or a set of OPTIONS; read from
+            SIGNALCHASER_PROFILE when not given
+    """
+
+    def __init__(self, name, options=False):
+        self.name = name
+        self.options = options_from_env() if options is False else options
+        self.enabled = self.options is not None
+        self.phases = {}       # phase name -> [calls, seconds]
+        self.backtests = []    # BacktestProfile analyses, one per strategy run
+        self.files = []
+        self._started = None
+        self._cprofile = None
+        self._sampler = None
+
+    def start(self):
+        """Start the wall clock and the optional cProfile / stack sampler"""
+        if not self.enabled:
+            return self
+        self._started = time.perf_counter()
+        if 'cprofile' in self.options:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        if 'stacks' in self.options:
+            self._sampler = _StackSampler(threading.get_ident())
+            self._sampler.start()
+        return self
+
+    def phase(self, name):
+        """Context manager adding the time spent inside to ``name``"""
+        if not self.enabled:
+            return _NULL
+        return self._timed(name)
+
+    @contextlib.contextmanager
+    def _timed(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.phases.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - t0
+
+    def run(self, cerebro):
+        """
+        ``cerebro.run()``, timed as the 'backtest' phase with a breakdown of
+        where the time went when profiling is on
+        """
+        if not self.enabled:
+            return cerebro.run()
+        from signalchaser.analyzers import BacktestProfile
+
+        cerebro.addanalyzer(BacktestProfile, _name='profile')
+        t0 = time.perf_counter()
+        with self.phase('backtest'):
+            results = cerebro.run()
+        total = time.perf_counter() - t0
+        for strat in results:
+            analysis = strat.analyzers.profile.get_analysis()
+            analysis['total'] = total / len(results)
+            analysis['setup'] = analysis.pop('started') - t0
+            self.backtests.append(analysis)
+        return results
+
+    def finish(self):
+        """Stop profiling, write the profile files and print the report"""
+        if not self.enabled:
+            return None
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            path = f"{self.name}_{stamp}.prof"
+            self._cprofile.dump_stats(path)
+            self.files.append(path)
+        if self._sampler is not None:
+            self._sampler.stop()
+            path = f"{self.name}_{stamp}.folded"
+            self._sampler.write(path)
+            self.files.append(path)
+        report = self.report()
+        print(report)
+        return report
+
+    def report(self):
+        """Text summary of the phases and the backtest breakdown"""
+        total = time.perf_counter() - self._started if self._started is not None else sum(
+            s for _, s in self.phases.values())
+        lines = [f"Profile of {self.name}: {total:.3f}s wall time", '',
+                 f"{'phase':<42}{'calls':>8}{'seconds':>10}{'share':>8}"]
+        for name, (calls, seconds) in self.phases.items():
+            lines.append(f"{name:<42}{calls:>8}{seconds:>10.3f}{seconds / total:>8.1%}")
+
+        if self.backtests:
+            rows = self._breakdown()
+            run_total = sum(b['total'] for b in self.backtests)
+            lines += ['', f"Backtest breakdown ({len(self.backtests)} runs, {run_total:.3f}s)",
+                      f"{'part':<42}{'calls':>8}{'seconds':>10}{'share':>8}"]
+            for name, calls, seconds in rows:
+                calls = '' if calls is None else calls
+                lines.append(f"{name:<42}{calls:>8}{seconds:>10.3f}{seconds / run_total:>8.1%}")
+        for path in self.files:
+            lines.append(f"Wrote {path}")
+        return '\n'.join(lines)
+
+    def _breakdown(self):
+        """Sum the per-run analyses into (name, calls, seconds) rows"""
+        sums = collections.defaultdict(lambda: [0, 0.0])
+        indicators = collections.defaultdict(lambda: [0, 0.0])
+        for b in self.backtests:
+            for part in ('next', 'prenext', 'analyzers', 'observers'):
+                sums[part][0] += b[part][0]
+                sums[part][1] += b[part][1]
+            for label, (calls, seconds) in b['indicators'].items():
+                indicators[label][0] += calls
+                indicators[label][1] += seconds
+
+        setup = sum(b['setup'] for b in self.backtests)
+        ind_calls = sum(c for c, _ in indicators.values())
+        ind_seconds = sum(s for _, s in indicators.values())
+        rows = [('setup (preload, strategy init)', None, setup),
+                ('indicators', ind_calls, ind_seconds)]
+        for label, (calls, seconds) in sorted(indicators.items(), key=lambda kv: -kv[1][1]):
+            rows.append((f"  {label}", calls, seconds))
+        rows += [('next()', *sums['next']),
+                 ('prenext()', *sums['prenext']),
+                 ('analyzers', *sums['analyzers']),
+                 ('observers', *sums['observers'])]
+        measured = setup + ind_seconds + sum(s for _, s in sums.values())
+        engine = sum(b['total'] for b in self.backtests) - measured
+        rows.append(('engine (feeds, broker, line buffers)', None, engine))
+        return rows
@@ -0,0 +1,162 @@
+"""
+Derive higher timeframes from the cached hourly bars
+
+Every timeframe (4h, 6h, 1d, 1w, ...) is built from the same hourly base
+series instead of being downloaded separately:
+
+* open = first open, high = max high, low = min low, close = last close,
+  volume = summed volume of the hourly bars in the bucket
+* buckets are aligned in UTC: hours and days on the epoch (00:00 UTC), weeks
+  on Monday 00:00 UTC, and labelled with their start time
+
+``Resampler`` keeps the derived series up to date as new hourly bars arrive,
+re-aggregating only the last (partial) bucket and any new ones. It only holds
+the hourly bars of buckets that can still change, so an update costs the same
+however much history has been pushed.
+"""
+import numpy as np
+import pandas as pd
+
+from signalchaser import market_data
+
+TIMEFRAMES = {
+    '1h': pd.Timedelta(hours=1),
+    '2h': pd.Timedelta(hours=2),
+    '4h': pd.Timedelta(hours=4),
+    '6h': pd.Timedelta(hours=6),
+    '8h': pd.Timedelta(hours=8),
+    '12h': pd.Timedelta(hours=12),
+    '1d': pd.Timedelta(days=1),
+    '1w': pd.Timedelta(weeks=1),
+}
+
+# Weekly buckets start on Monday, the epoch was a Thursday
+_ANCHORS = {'1w': pd.Timestamp('1970-01-05', tz='UTC').value}
+
+
+def _width(timeframe):
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return TIMEFRAMES[timeframe].value
+
+
+def bucket_start(timestamps, timeframe):
+    """UTC start of the bucket containing each timestamp (int64 ns in and out)"""
+    width = _width(timeframe)
+    anchor = _ANCHORS.get(timeframe, 0)
+    return (np.asarray(timestamps, dtype=np.int64) - anchor) // width * width + anchor
+
+
+def resample_ohlcv(df, timeframe):
+    """
+    Aggregate a normalized OHLCV frame into ``timeframe`` buckets
+
+    Args:
+        df: Normalized OHLCV frame (see market_data.normalize_ohlcv), usually hourly
+        timeframe: Key of TIMEFRAMES, e.g. '4h' or '1d'
+
+    Returns:
+        Normalized OHLCV frame indexed by bucket start. Buckets with no source
+        bars are skipped, the first and last buckets may be partial.
+    """
+    if df.empty:
+        return market_data.empty_frame()
+
+    keys = bucket_start(df.index.as_unit('ns').asi8, timeframe)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+
+    out = pd.DataFrame({
+        'open': df['open'].to_numpy()[starts],
+        'high': np.maximum.reduceat(df['high'].to_numpy(), starts),
+        'low': np.minimum.reduceat(df['low'].to_numpy(), starts),
+        'close': df['close'].to_numpy()[ends],
+        'volume': np.add.reduceat(df['volume'].to_numpy(), starts),
+    }, index=pd.DatetimeIndex(pd.to_datetime(keys[starts], utc=True), name='datetime'))
+    return out
+
+
+class Resampler:
+    """
+    Incrementally maintained set of timeframes derived from one hourly series
+
+    Example:
+        r = Resampler(['4h', '1d'])
+        r.update(market_data.get_bars('BTC-USD', start, interval='1h'))
+        ...
+        r.update(new_hourly_bars)   # only the last bucket is rebuilt
+        daily = r['1d']
+
+    Once a newer bucket has started for every timeframe, the older buckets are
+    final: their hourly bars are dropped and bars pushed for them are ignored.
+    """
+
+    def __init__(self, timeframes=('4h', '6h', '1d', '1w')):
+        for tf in timeframes:
+            _width(tf)
+        self.timeframes = list(timeframes)
+        self.base = market_data.empty_frame()   # hourly bars of the buckets still open
+        self.base_start = None                  # start of the oldest bucket still open
+        self.frames = {tf: market_data.empty_frame() for tf in self.timeframes}
+
+    def __getitem__(self, timeframe):
+        return self.frames[timeframe]
+
+    def update(self, bars):
+        """
+        Add new (or revised) hourly bars and refresh the derived timeframes
+
+        Bars at timestamps already present replace the old values, so the
+        still-open hourly bar can be pushed repeatedly.
+        """
+        bars = market_data.normalize_ohlcv(bars)
+        if self.base_start is not None:
+            bars = bars[bars.index >= self.base_start]
+        if bars.empty:
+            return self
+        if self.base.empty:
+            self.base = bars
+        elif bars.index[0] > self.base.index[-1]:
+            # Usual case, the new bars follow the stored ones
+            self.base = pd.concat([self.base, bars])
+        else:
+            base = pd.concat([self.base, bars])
+            self.base = base[~base.index.duplicated(keep='last')].sort_index()
+
+        first_new = bars.index.as_unit('ns').asi8[0]
+        for tf in self.timeframes:
+            # Everything from the bucket holding the earliest new bar is rebuilt
+            cutoff = pd.Timestamp(bucket_start([first_new], tf)[0], tz='UTC')
+            kept = self.frames[tf]
+            kept = kept.iloc[:kept.index.searchsorted(cutoff)]
+            fresh = resample_ohlcv(self.base.iloc[self.base.index.searchsorted(cutoff):], tf)
+            self.frames[tf] = pd.concat([kept, fresh]) if not kept.empty else fresh
+
+        # Only the last bucket of each timeframe can still change, drop the hourly bars before them
+        last = self.base.index.as_unit('ns').asi8[-1]
+        self.base_start = pd.Timestamp(min(bucket_start([last], tf)[0] for tf in self.timeframes), tz='UTC')
+        self.base = self.base.iloc[self.base.index.searchsorted(self.base_start):]
+        return self
+
+    def is_partial(self, timeframe, now=None):
+        """True if the last bucket of ``timeframe`` has not closed yet"""
+        frame = self.frames[timeframe]
+        if frame.empty:
+            return False
+        now = market_data.to_utc(now if now is not None else pd.Timestamp.now(tz='UTC'))
+        return frame.index[-1] + TIMEFRAMES[timeframe] > now
+
+
+def get_resampled(symbols, timeframe, start, end=None, offline=False):
+    """
+    Bars for ``timeframe`` derived from the cached hourly series
+
+    Same arguments and return shape as market_data.get_bars. Only hourly data
+    is ever downloaded, ``start`` is widened to the bucket start so the first
+    bucket is complete.
+    """
+    start = pd.Timestamp(bucket_start([market_data.to_utc(start).value], timeframe)[0], tz='UTC')
+    hourly = market_data.get_bars(symbols, start, end, interval='1h', offline=offline)
+    if isinstance(hourly, pd.DataFrame):
+        return resample_ohlcv(hourly, timeframe)
+    return {symbol: resample_ohlcv(df, timeframe) for symbol, df in hourly.items()}
@@ -0,0 +1,298 @@
+"""
+Indexed SQLite store for backtest runs, parameters, trades and equity curves
+
+Tables:
+
+* ``runs``: one row per backtest with its metrics (see signalchaser.metrics)
+* ``params``: strategy parameters, one row per (run, name)
+* ``trades``: closed trades, including the entry gap where the strategy has one
+* ``equity``: equity curve, timestamps and positions per run as float64 blobs
+
+The database uses WAL mode, so parallel sweep workers can each open their own
+``ResultsStore`` and write concurrently. ``save_runs`` inserts a whole batch in
+one transaction. Location defaults to ``results/backtests.sqlite`` at the repo
+root and can be moved with ``SIGNALCHASER_RESULTS_DB``.
+"""
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from signalchaser.metrics import closed_trade_stats
+
+DB_PATH = os.environ.get(
+    'SIGNALCHASER_RESULTS_DB',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results', 'backtests.sqlite'),
+)
+
+# Metric columns of the runs table, also the allowed sort keys for best_params
+METRIC_COLUMNS = (
+    'total_return', 'cagr', 'volatility', 'sharpe', 'sortino', 'max_drawdown',
+    'max_drawdown_duration', 'exposure', 'total_trades', 'win_rate',
+    'avg_trade_return', 'final_value',
+)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    interval TEXT,
+    start TEXT,
+    end TEXT,
+    sweep_id TEXT,
+    {', '.join(f'{c} REAL' for c in METRIC_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS idx_runs_strategy_symbol ON runs (strategy, symbol);
+CREATE INDEX IF NOT EXISTS idx_runs_sweep ON runs (sweep_id);
+
+CREATE TABLE IF NOT EXISTS params (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    value_text TEXT,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_params_name_value ON params (name, value);
+
+CREATE TABLE IF NOT EXISTS trades (
+    trade_id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    symbol TEXT NOT NULL,
+    entry_date TEXT,
+    exit_date TEXT,
+    entry_price REAL,
+    exit_price REAL,
+    size REAL,
+    profit_loss REAL,
+    profit_loss_net REAL,
+    return_pct REAL,
+    gap REAL
+);
+CREATE INDEX IF NOT EXISTS idx_trades_run ON trades (run_id);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades (symbol);
+CREATE INDEX IF NOT EXISTS idx_trades_gap ON trades (gap);
+
+CREATE TABLE IF NOT EXISTS equity (
+    run_id INTEGER PRIMARY KEY REFERENCES runs (run_id) ON DELETE CASCADE,
+    timestamps BLOB,
+    equity BLOB NOT NULL,
+    positions BLOB
+);
+"""
+
+TRADE_COLUMNS = (
+    'symbol', 'entry_date', 'exit_date', 'entry_price', 'exit_price', 'size',
+    'profit_loss', 'profit_loss_net', 'return_pct', 'gap',
+)
+
+
+def _blob(values, dtype=np.float64):
+    return None if values is None else np.ascontiguousarray(values, dtype=dtype).tobytes()
+
+
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return pd.Timestamp(value).isoformat()
+    return str(value)
+
+
+def _number(value):
+    """Float for numeric values (numpy included), None for anything else"""
+    if isinstance(value, (bool, np.bool_)):
+        return float(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        value = float(value)
+        return value if np.isfinite(value) else None
+    return None
+
+
+class ResultsStore:
+    """
+    Connection to the results database
+
+    Args:
+        path: SQLite file, created with its parent folder if missing
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DB_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=60)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _insert_run(self, run):
+        metrics = dict(run.get('metrics') or {})
+        trades = run.get('trades')
+        if trades is not None:
+            # Counted from the stored trades, so the run row and its trade rows agree
+            stats = closed_trade_stats([t['profit_loss_net'] for t in trades])
+            metrics['total_trades'] = stats['total_trades']
+            metrics['win_rate'] = stats['win_rate']
+        if metrics.get('final_value') is None and run.get('equity') is not None and len(run['equity']):
+            metrics['final_value'] = run['equity'][-1]
+        columns = ['created_at', 'strategy', 'symbol', 'interval', 'start', 'end', 'sweep_id', *METRIC_COLUMNS]
+        values = [
+            datetime.now(timezone.utc).isoformat(),
+            run['strategy'],
+            run['symbol'],
+            run.get('interval'),
+            _text(run.get('start')),
+            _text(run.get('end')),
+            run.get('sweep_id'),
+            *(_number(metrics.get(c)) for c in METRIC_COLUMNS),
+        ]
+        cur = self.conn.execute(
+            f"INSERT INTO runs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", values)
+        run_id = cur.lastrowid
+
+        params = run.get('params') or {}
+        self.conn.executemany(
+            "INSERT INTO params (run_id, name, value, value_text) VALUES (?, ?, ?, ?)",
+            [(run_id, name, _number(value), _text(value)) for name, value in params.items()])
+
+        self.conn.executemany(
+            f"INSERT INTO trades (run_id, {', '.join(TRADE_COLUMNS)}) "
+            f"VALUES (?, {', '.join('?' * len(TRADE_COLUMNS))})",
+            [(run_id, t.get('symbol') or run['symbol'], _text(t.get('entry_date')), _text(t.get('exit_date')),
+              *(_number(t.get(c)) for c in TRADE_COLUMNS[3:]))
+             for t in trades or ()])
+
+        if run.get('equity') is not None:
+            timestamps = run.get('timestamps')
+            if timestamps is not None:
+                # Backtrader hands out naive UTC datetimes
+                timestamps = pd.DatetimeIndex(timestamps)
+                if timestamps.tz is None:
+                    timestamps = timestamps.tz_localize('UTC')
+                timestamps = timestamps.as_unit('ns').asi8
+            self.conn.execute(
+                "INSERT INTO equity (run_id, timestamps, equity, positions) VALUES (?, ?, ?, ?)",
+                (run_id, _blob(timestamps, np.int64), _blob(run['equity']), _blob(run.get('positions'))))
+        return run_id
+
+    def save_run(self, strategy, symbol, **run):
+        """
+        Store one backtest run
+
+        Args:
+            strategy: Strategy name, e.g. 'supertrend'
+            symbol: Symbol, or a label such as 'portfolio' for multi-feed runs
+            **run: Optional interval, start, end, sweep_id, params (dict),
+                metrics (dict from metrics.compute_metrics), trades (list of
+                dicts with TRADE_COLUMNS keys), equity / positions (arrays)
+                and timestamps. With trades, total_trades and win_rate are
+                counted from them. final_value defaults to the last equity value.
+
+        Returns:
+            The new run_id
+        """
+        return self.save_runs([dict(run, strategy=strategy, symbol=symbol)])[0]
+
+    def save_runs(self, runs):
+        """Bulk-insert many runs (dicts as for save_run) in one transaction"""
+        with self.conn:
+            return [self._insert_run(run) for run in runs]
+
+    def query(self, sql, args=()):
+        """Run any SQL query and return a DataFrame"""
+        return pd.read_sql_query(sql, self.conn, params=args)
+
+    def best_params(self, metric='sharpe', strategy=None, sweep_id=None):
+        """
+        Best run per symbol by ``metric``, with its parameters as columns
+
+        Drawdown metrics are ranked lowest-first, everything else highest-first.
+        """
+        if metric not in METRIC_COLUMNS:
+            raise ValueError(f"Unknown metric: {metric}")
+        order = 'ASC' if metric.startswith('max_drawdown') else 'DESC'
+        where, args = ['r.{} IS NOT NULL'.format(metric)], []
+        if strategy is not None:
+            where.append('r.strategy = ?')
+            args.append(strategy)
+        if sweep_id is not None:
+            where.append('r.sweep_id = ?')
+            args.append(sweep_id)
+
+        best = self.query(f"""
+            SELECT * FROM (
+                SELECT r.*, ROW_NUMBER() OVER (
+                    PARTITION BY r.strategy, r.symbol ORDER BY r.{metric} {order}) AS rank
+                FROM runs r WHERE {' AND '.join(where)}
+            ) WHERE rank = 1
+        """, args).drop(columns='rank')
+        if best.empty:
+            return best
+
+        ids = best['run_id'].tolist()
+        params = self.query(
+            f"SELECT run_id, name, value, value_text FROM params WHERE run_id IN ({', '.join('?' * len(ids))})", ids)
+        if not params.empty:
+            params['param'] = params['value'].where(params['value'].notna(), params['value_text'])
+            wide = params.pivot(index='run_id', columns='name', values='param')
+            best = best.join(wide, on='run_id')
+        return best.sort_values(['strategy', 'symbol']).reset_index(drop=True)
+
+    def trades(self, min_gap=None, symbol=None, strategy=None):
+        """Stored trades, optionally filtered by entry gap, symbol and strategy"""
+        where, args = ['1 = 1'], []
+        if min_gap is not None:
+            where.append('t.gap >= ?')
+            args.append(min_gap)
+        if symbol is not None:
+            where.append('t.symbol = ?')
+            args.append(symbol)
+        if strategy is not None:
+            where.append('r.strategy = ?')
+            args.append(strategy)
+        return self.query(f"""
+            SELECT t.*, r.strategy, r.sweep_id FROM trades t JOIN runs r USING (run_id)
+            WHERE {' AND '.join(where)} ORDER BY t.entry_date
+        """, args)
+
+    def equity_curve(self, run_id):
+        """Equity curve of a run as a DataFrame (equity, positions)"""
+        row = self.conn.execute(
+            "SELECT timestamps, equity, positions FROM equity WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        timestamps, equity, positions = row
+        data = {'equity': np.frombuffer(equity, dtype=np.float64)}
+        if positions is not None:
+            data['positions'] = np.frombuffer(positions, dtype=np.float64)
+        index = None
+        if timestamps is not None:
+            index = pd.DatetimeIndex(pd.to_datetime(np.frombuffer(timestamps, dtype=np.int64), utc=True),
+                                     name='datetime')
+        return pd.DataFrame(data, index=index)
+
+
+def strategy_params(strategy):
+    """
+    Parameters of a Backtrader strategy instance as a plain dict
+
+    Only scalar parameters are kept, data passed in as a parameter (e.g.
+    precomputed features) is not a setting worth storing.
+    """
+    return {
+        name: value for name, value in strategy.params._getkwargs().items()
+        if value is None or isinstance(value, (str, bool, int, float, np.integer, np.floating))
+    }
@@ -0,0 +1,349 @@
+"""
+Offline market data providers for load and regression testing
+
+Two providers share the ``get_bars`` signature of ``market_data.get_bars`` and
+can be plugged in behind it (and behind ``fetch_data`` / ``fetch_crypto_data``
+/ ``get_top_1000_cryptos``) with ``market_data.set_provider`` or the
+``SIGNALCHASER_PROVIDER`` environment variable:
+
+* ``SyntheticProvider`` generates seeded GBM or jump-diffusion OHLCV for any
+  symbol, with optional price gaps between bars and missing bars. The same
+  seed and symbol always give the same bars, whatever window is requested.
+* ``ReplayProvider`` serves bars recorded in a market data cache directory.
+
+Both can add simulated latency and random fetch errors, and ``stream`` replays
+bars in time order at a configurable speed.
+
+Environment examples::
+
+    SIGNALCHASER_PROVIDER=synthetic           # seed 0, GBM
+    SIGNALCHASER_PROVIDER=synthetic:42:jump   # seed 42, jump-diffusion
+    SIGNALCHASER_PROVIDER=replay:/path/to/data_cache
+
+Run ``python -m signalchaser.simulator --symbols 10000`` for a load test.
+"""
+import os
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from signalchaser import market_data
+
+# Every synthetic path starts here, bars before it are not generated
+ORIGIN = pd.Timestamp('2015-01-01', tz='UTC')
+
+# Paths are anchored here: a symbol trades at its drawn price around this date,
+# so recent windows keep realistic price levels however far ORIGIN lies back
+ANCHOR = pd.Timestamp('2025-01-01', tz='UTC')
+
+# Bars per bridge block, coarse increments are drawn once per block
+BLOCK_BARS = 256
+
+HOURS_PER_YEAR = 24 * 365
+
+
+class SimulatedFetchError(Exception):
+    """Raised (and reported like a network failure) for a simulated fetch error"""
+
+
+def bar_length(interval):
+    """Bar length of a yfinance interval as a Timedelta"""
+    if interval == '1wk':
+        return pd.Timedelta(weeks=1)
+    if interval not in market_data.INTERVALS:
+        raise ValueError(f"Unsupported interval: {interval}")
+    return pd.Timedelta(market_data.INTERVALS[interval])
+
+
+def _symbol_seed(seed, symbol, stream):
+    """Independent, order-free seed for one symbol and random stream"""
+    return [seed, zlib.crc32(symbol.encode('utf-8')), stream]
+
+
+class _SimulatedProvider:
+    """Shared latency / error simulation and time-ordered streaming"""
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._fault_rng = np.random.default_rng([seed, 0xFA17])
+
+    def _bars(self, symbol, start, end, interval):
+        raise NotImplementedError
+
+    def fetch(self, symbol, start, end=None, interval='1h'):
+        """Bars for one symbol, with simulated latency and errors"""
+        if self.latency:
+            # Exponential jitter around the configured mean latency
+            time.sleep(self._fault_rng.exponential(self.latency))
+        if self.error_rate and self._fault_rng.random() < self.error_rate:
+            raise SimulatedFetchError(f"Simulated fetch error for {symbol}")
+        start = market_data.to_utc(start)
+        end = market_data.to_utc(end if end is not None else pd.Timestamp.now(tz='UTC'))
+        return self._bars(symbol, start, end, interval)
+
+    def get_bars(self, symbols, start, end=None, interval='1h', offline=False, mmap=False):
+        """Same contract as ``market_data.get_bars``, failures give an empty frame"""
+        single = isinstance(symbols, str)
+        symbol_list = [symbols] if single else list(symbols)
+
+        out = {}
+        for symbol in symbol_list:
+            try:
+                out[symbol] = self.fetch(symbol, start, end, interval)
+            except Exception as e:
+                print(f"Error fetching {symbol} {interval}: {e}")
+                out[symbol] = market_data.empty_frame()
+        return out[symbol_list[0]] if single else out
+
+    def stream(self, symbols, start, end=None, interval='1h', speed=None):
+        """
+        Replay bars in time order
+
+        Yields ``(timestamp, frame)`` where ``frame`` holds one row per symbol
+        that has a bar at that timestamp.
+
+        Args:
+            speed: Replay speed relative to real time (3600 plays one hourly
+                bar per second). None replays as fast as possible.
+        """
+        frames = self.get_bars(list(symbols), start, end, interval)
+        frames = {s: df for s, df in frames.items() if not df.empty}
+        if not frames:
+            return
+        panel = pd.concat(frames, names=['symbol', 'datetime']).swaplevel().sort_index()
+        delay = bar_length(interval).total_seconds() / speed if speed else 0
+        for ts, rows in panel.groupby(level='datetime', sort=True):
+            yield ts, rows.droplevel('datetime')
+            if delay:
+                time.sleep(delay)
+
+
+class SyntheticProvider(_SimulatedProvider):
+    """
+    Seeded synthetic OHLCV generator
+
+    Log prices follow GBM, plus Poisson jumps when ``model='jump'``. To keep
+    any window cheap and consistent, the path is built from coarse increments
+    per block of ``BLOCK_BARS`` bars (drawn from one stream per symbol) and a
+    Brownian bridge filling each block from its own seeded stream. The path
+    is shifted so the block holding ANCHOR opens at the symbol's drawn price.
+
+    Args:
+        seed: Base seed, combined with the symbol name
+        model: 'gbm' or 'jump'
+        drift: Annual drift of prices (log returns drift by drift - sigma^2 / 2)
+        volatility: Typical annual volatility, varied per symbol
+        jump_intensity: Expected jumps per year ('jump' model)
+        jump_mean: Mean log jump size
+        jump_std: Std of log jump size
+        gap_prob: Probability that a bar opens away from the previous close
+        gap_std: Std of the log gap between previous close and open
+        missing_prob: Probability that a bar is missing from the output
+        latency: Mean simulated latency per symbol fetch in seconds
+        error_rate: Probability that a symbol fetch fails
+    """
+
+    def __init__(self, seed=0, model='gbm', drift=0.0, volatility=0.8,
+                 jump_intensity=12.0, jump_mean=0.0, jump_std=0.08,
+                 gap_prob=0.0, gap_std=0.01, missing_prob=0.0,
+                 latency=0.0, error_rate=0.0):
+        if model not in ('gbm', 'jump'):
+            raise ValueError(f"Unknown model: {model}")
+        super().__init__(latency=latency, error_rate=error_rate, seed=seed)
+        self.seed = seed
+        self.model = model
+        self.drift = drift
+        self.volatility = volatility
+        self.jump_intensity = jump_intensity if model == 'jump' else 0.0
+        self.jump_mean = jump_mean
+        self.jump_std = jump_std
+        self.gap_prob = gap_prob
+        self.gap_std = gap_std
+        self.missing_prob = missing_prob
+
+    def _symbol_params(self, symbol):
+        """Per-symbol price at ANCHOR, volatility and volume scale"""
+        rng = np.random.default_rng(_symbol_seed(self.seed, symbol, 0))
+        price = float(np.exp(rng.uniform(np.log(0.01), np.log(50000))))
+        sigma = float(self.volatility * np.exp(rng.normal(0, 0.3)))
+        volume = float(np.exp(rng.normal(13, 2))) / price
+        return price, sigma, volume
+
+    def _block_increments(self, symbol, n_blocks, dt, sigma):
+        """Total log-price change of each block since ORIGIN (prefix-stable)"""
+        n = BLOCK_BARS
+        drift = (self.drift - 0.5 * sigma ** 2) * dt * n
+        diffusion = np.random.default_rng(_symbol_seed(self.seed, symbol, 1)).standard_normal(n_blocks)
+        diffusion *= sigma * np.sqrt(dt * n)
+        jumps = np.zeros(n_blocks)
+        counts = np.zeros(n_blocks, dtype=np.int64)
+        if self.jump_intensity:
+            counts = np.random.default_rng(_symbol_seed(self.seed, symbol, 2)).poisson(
+                self.jump_intensity * dt * n, n_blocks)
+            sizes = np.random.default_rng(_symbol_seed(self.seed, symbol, 3)).standard_normal(n_blocks)
+            jumps = counts * self.jump_mean + np.sqrt(counts) * self.jump_std * sizes
+        return drift + diffusion, jumps, counts
+
+    def _fill_block(self, symbol, block, diffusion_total, jump_total, n_jumps, dt, sigma):
+        """Per-bar log returns of one block, summing exactly to the coarse total"""
+        n = BLOCK_BARS
+        rng = np.random.default_rng(_symbol_seed(self.seed, symbol, 16 + block))
+        z = rng.standard_normal(n) * sigma * np.sqrt(dt)
+        # Brownian bridge: shift the increments so they add up to the coarse move
+        steps = z - (z.sum() - diffusion_total) / n
+        if n_jumps:
+            positions = rng.integers(0, n, n_jumps)
+            sizes = self.jump_mean + self.jump_std * rng.standard_normal(n_jumps)
+            sizes += (jump_total - sizes.sum()) / n_jumps
+            np.add.at(steps, positions, sizes)
+        gaps = np.where(rng.random(n) < self.gap_prob, rng.normal(0, self.gap_std, n), 0.0)
+        wicks = np.abs(rng.standard_normal((2, n))) * sigma * np.sqrt(dt) * 0.5
+        noise = rng.normal(0, 0.5, n)
+        keep = rng.random(n) >= self.missing_prob
+        return steps, gaps, wicks, noise, keep
+
+    def _bars(self, symbol, start, end, interval):
+        step = bar_length(interval)
+        if start < ORIGIN:
+            raise ValueError(f"Synthetic data starts at {ORIGIN}, requested {start}")
+        first = -(-(start - ORIGIN) // step)   # ceil, first bar at or after start
+        last = -(-(end - ORIGIN) // step)      # exclusive
+        if last <= first:
+            return market_data.empty_frame()
+
+        price, sigma, volume_scale = self._symbol_params(symbol)
+        dt = step / pd.Timedelta(hours=1) / HOURS_PER_YEAR
+        first_block, last_block = first // BLOCK_BARS, (last - 1) // BLOCK_BARS
+        anchor_block = (ANCHOR - ORIGIN) // step // BLOCK_BARS
+        diffusion, jumps, counts = self._block_increments(symbol, max(last_block, anchor_block) + 1, dt, sigma)
+        coarse = diffusion + jumps
+        level = np.log(price) + coarse[:first_block].sum() - coarse[:anchor_block].sum()
+
+        parts = [self._fill_block(symbol, b, diffusion[b], jumps[b], counts[b], dt, sigma)
+                 for b in range(first_block, last_block + 1)]
+        steps, gaps, wicks, noise, keep = (np.concatenate(p, axis=-1) for p in zip(*parts))
+
+        log_close = level + np.cumsum(steps)
+        prev_close = np.concatenate([[level], log_close[:-1]])
+        log_open = prev_close + gaps
+        close = np.exp(log_close)
+        open_ = np.exp(log_open)
+        high = np.maximum(open_, close) * np.exp(wicks[0])
+        low = np.minimum(open_, close) * np.exp(-wicks[1])
+        activity = 1.0 + 50.0 * np.abs(log_close - log_open)
+        volume = volume_scale * np.exp(noise) * activity
+
+        lo = first - first_block * BLOCK_BARS
+        hi = lo + (last - first)
+        window = slice(lo, hi)
+        index = pd.to_datetime(ORIGIN.value + step.value * np.arange(first, last), utc=True)
+        df = pd.DataFrame({
+            'open': open_[window],
+            'high': high[window],
+            'low': low[window],
+            'close': close[window],
+            'volume': volume[window],
+        }, index=pd.DatetimeIndex(index, name='datetime'))
+        return df[keep[window]]
+
+    def get_top_cryptos(self, n=1000):
+        """Synthetic universe in the CoinGecko /coins/markets response format"""
+        now = pd.Timestamp.now(tz='UTC')
+        coins = []
+        for rank in range(1, n + 1):
+            symbol = f'syn{rank:05d}'
+            price, _, volume = self._symbol_params(f'{symbol.upper()}-USD')
+            # Simulated close of the latest hour, the drawn price is the one at ANCHOR
+            recent = self._bars(f'{symbol.upper()}-USD', now - pd.Timedelta(days=1), now, '1h')
+            coins.append({
+                'id': symbol,
+                'symbol': symbol,
+                'name': f'Synthetic {rank}',
+                'market_cap_rank': rank,
+                'current_price': float(recent['close'].iloc[-1]) if not recent.empty else price,
+                'total_volume': volume * price,
+                'market_cap': volume * price * 50,
+            })
+        return coins
+
+
+class ReplayProvider(_SimulatedProvider):
+    """
+    Serve bars recorded in a market data cache directory
+
+    Record a session once with the live provider (``market_data.get_bars``
+    fills ``data_cache/``), copy the directory, then replay it offline.
+
+    Args:
+        directory: Cache directory in the ``market_data`` layout
+        latency: Mean simulated latency per symbol fetch in seconds
+        error_rate: Probability that a symbol fetch fails
+        seed: Seed for the latency / error simulation
+    """
+
+    def __init__(self, directory, latency=0.0, error_rate=0.0, seed=0):
+        super().__init__(latency=latency, error_rate=error_rate, seed=seed)
+        self.directory = directory
+
+    def _bars(self, symbol, start, end, interval):
+        return market_data.read_cache(symbol, interval, start, end, cache_dir=self.directory)
+
+    def get_top_cryptos(self, n=1000, interval='1h'):
+        """Recorded symbols in the CoinGecko /coins/markets response format"""
+        path = os.path.join(self.directory, interval)
+        symbols = sorted(os.listdir(path)) if os.path.isdir(path) else []
+        return [{
+            'id': s.lower(),
+            'symbol': s.split('-')[0].lower(),
+            'name': s.split('-')[0],
+            'market_cap_rank': rank,
+        } for rank, s in enumerate(symbols[:n], start=1)]
+
+
+def provider_from_spec(spec):
+    """
+    Build a provider from a ``SIGNALCHASER_PROVIDER`` value
+
+    'synthetic[:seed[:model]]' or 'replay:<directory>'. Returns None for
+    'yahoo' / empty, meaning the live cached provider.
+    """
+    if not spec or spec == 'yahoo':
+        return None
+    kind, _, rest = spec.partition(':')
+    if kind == 'synthetic':
+        seed, _, model = rest.partition(':')
+        return SyntheticProvider(seed=int(seed or 0), model=model or 'gbm')
+    if kind == 'replay':
+        return ReplayProvider(rest)
+    raise ValueError(f"Unknown provider spec: {spec}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load test against the synthetic provider")
+    parser.add_argument('--symbols', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--interval', default='1h')
+    parser.add_argument('--model', default='gbm', choices=['gbm', 'jump'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--missing', type=float, default=0.0)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--errors', type=float, default=0.0)
+    args = parser.parse_args()
+
+    provider = SyntheticProvider(seed=args.seed, model=args.model, missing_prob=args.missing,
+                                 latency=args.latency, error_rate=args.errors)
+    symbols = [f"{c['symbol'].upper()}-USD" for c in provider.get_top_cryptos(args.symbols)]
+    end = pd.Timestamp.now(tz='UTC').floor('1D')
+    start = end - pd.Timedelta(days=args.days)
+
+    t0 = time.perf_counter()
+    frames = provider.get_bars(symbols, start, end, interval=args.interval)
+    elapsed = time.perf_counter() - t0
+    bars = sum(len(df) for df in frames.values())
+    print(f"Generated {bars:,} bars for {len(frames):,} symbols in {elapsed:.2f}s "
+          f"({bars / elapsed:,.0f} bars/s)")